@@ -0,0 +1,271 @@
+"""
+Core microbenchmarks: planner, persistence and graph updates.
+
+Times the paths that run every turn on synthetic data at several sizes:
+  - planner.suggest_training, with profiles cached and with profiles.json
+    re-read first (as every call used to do)
+  - profiles.record_action_gain, alone and with the flush that writes
+    profiles.json back, and record_feedback (which flushes itself)
+  - state.save_state with long histories, and appending a turn to a RunHistory
+  - gui.graph_ui.update_graph on long histories (offscreen Qt)
+
+Everything runs headless in a temporary directory; the real profiles.json
+and run_state.json are never touched.
+
+    python -m benchmarks.core_bench --out core_bench.json
+    python -m benchmarks.core_bench --profiles 10 1000 --history 100 20000 --compare core_bench.json
+
+Results are per-call times written as JSON keyed by case name, so runs from
+different commits can be compared with --compare.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from stat_planner import planner, profiles, state, database, settings
+from stat_planner.settings import STATS
+from stat_planner.history import RunHistory
+from benchmarks.timing import summarize_times, git_commit
+
+PROFILE_SIZES = [10, 100, 1000]
+HISTORY_SIZES = [100, 1000, 10000]
+MIN_SAMPLE_S = 0.002   # Calls are batched until one timing sample takes at least this long
+
+# === Synthetic data ===
+
+def make_profile(rng, i):
+    ideal = {s: rng.randint(300, 1200) for s in STATS}
+    action_stats = {
+        a: {"count": rng.randint(0, 200), "gains": {s: rng.randint(0, 3000) for s in STATS}}
+        for a in [*STATS, "recover"]
+    }
+    return {
+        "name": f"Trainee {i}",
+        "ideal_stats": ideal,
+        "photo": None,
+        "analytics": {
+            "action_stats": action_stats,
+            "optional_feedback": {s: rng.randint(0, 50) for s in STATS},
+            "loss_feedback": {s: rng.randint(0, 20) for s in STATS},
+            "loss_reasons": {s: rng.randint(0, 20) for s in STATS},
+        },
+    }
+
+def make_history(rng, turns):
+    stats = {s: 100 for s in STATS}
+    history = []
+    for _ in range(turns):
+        trained = rng.choice(STATS)
+        stats = {s: min(2000, v + rng.randint(0, 4) + (rng.randint(10, 30) if s == trained else 0))
+                 for s, v in stats.items()}
+        history.append(stats)
+    return history
+
+def make_state(rng, history):
+    ideal = {s: rng.randint(300, 1200) for s in STATS}
+    return {
+        "profile_index": 0,
+        "ideal_stats": ideal,
+        "current_stats": history[-1],
+        "history": history,
+        "feedback_stat": None,
+        "total_rounds": 3,
+        "rounds_done": 1,
+        "turns_left": 4,
+        "turn": len(history),
+        "stat_priorities": {s: "Normal" for s in STATS},
+    }
+
+# === Timing ===
+
+def time_call(fn, repeat):
+    """Per-call times of `fn` over `repeat` samples, each batching enough calls to be measurable."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= MIN_SAMPLE_S or number >= 1 << 20:
+            break
+        number *= 2
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return dict(summarize_times(samples), min_ms=min(samples) * 1000, calls_per_sample=number)
+
+@contextlib.contextmanager
+def sandbox(profile_list=None):
+    """Point profiles.json, run_state.json and the database at a temp dir, with `profile_list` loaded."""
+    saved = (profiles.PROFILES_FILE, state.STATE_FILE, profiles._profiles, set(profiles._dirty))
+    saved_db = database.DATABASE_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles.PROFILES_FILE = Path(tmp) / "profiles.json"
+        state.STATE_FILE = Path(tmp) / "run_state.json"
+        database.close()
+        database.DATABASE_FILE = Path(tmp) / "stat_planner.db"
+        profiles._dirty.clear()
+        profiles._profiles = profile_list
+        if profile_list is not None:
+            profiles.save_profiles(profile_list)
+        try:
+            yield
+        finally:
+            database.close()
+            database.DATABASE_FILE = saved_db
+            profiles._dirty.clear()
+            profiles.PROFILES_FILE, state.STATE_FILE, profiles._profiles = saved[:3]
+            profiles._dirty.update(saved[3])
+
+# === Cases ===
+
+def bench_suggest(profile_list, repeat):
+    rng = random.Random(1)
+    index = len(profile_list) - 1
+    ideal = profile_list[index]["ideal_stats"]
+    current = {s: rng.randint(100, v) for s, v in ideal.items()}
+    priorities = {s: rng.choice(["Low", "Normal", "High"]) for s in STATS}
+    quiet = io.StringIO()
+
+    def suggest():
+        quiet.seek(0)
+        quiet.truncate()
+        with contextlib.redirect_stdout(quiet):   # suggest_training prints its working
+            planner.suggest_training(current, ideal, 4, "speed", index, priorities)
+
+    def suggest_cold():
+        profiles._profiles = None
+        suggest()
+
+    with sandbox(profile_list):
+        return {"cached": time_call(suggest, repeat), "cold": time_call(suggest_cold, repeat)}
+
+def bench_record(profile_list, repeat):
+    rng = random.Random(2)
+    index = len(profile_list) // 2
+    prev = {s: rng.randint(100, 800) for s in STATS}
+    new = {s: v + rng.randint(0, 25) for s, v in prev.items()}
+
+    def gain():
+        profiles.record_action_gain(index, "speed", prev, new)
+
+    def feedback():
+        profiles.record_feedback(index, "power", loss=True)
+
+    def with_flush(fn):
+        def run():
+            fn()
+            profiles.flush_profiles()
+        return run
+
+    with sandbox(profile_list):
+        return {
+            "record_action_gain": time_call(gain, repeat),
+            "record_feedback": time_call(feedback, repeat),
+            "record_action_gain+flush": time_call(with_flush(gain), repeat),
+        }
+
+def bench_save_state(run_state, repeat):
+    with sandbox():
+        return time_call(lambda: state.save_state(run_state), repeat)
+
+def bench_history_append(run_state, repeat):
+    history = RunHistory(run_state["history"])
+    turn = run_state["current_stats"]
+    return time_call(lambda: history.append(turn), repeat)
+
+def bench_update_graph(run_state, repeat):
+    from types import SimpleNamespace
+    from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout
+    from stat_planner.gui.graph_ui import setup_graphs, update_graph
+    app = QApplication.instance() or QApplication([])
+    window = QWidget()
+    gui = SimpleNamespace(main_layout=QVBoxLayout(window), history=RunHistory(run_state["history"]),
+                          ideal_stats=run_state["ideal_stats"])
+    setup_graphs(gui)
+    window.show()
+    app.processEvents()
+    result = time_call(lambda: update_graph(gui), repeat)
+    window.close()
+    return result
+
+def set_backend(backend):
+    settings.STORAGE_BACKEND = backend
+
+def run_benchmark(profile_sizes=PROFILE_SIZES, history_sizes=HISTORY_SIZES, repeat=20, graph=True,
+                  backend="json"):
+    set_backend(backend)
+    rng = random.Random(0)
+    cases = {}
+    for n in profile_sizes:
+        profile_list = [make_profile(rng, i) for i in range(n)]
+        for mode, t in bench_suggest(profile_list, repeat).items():
+            cases[f"suggest_training/{mode}/profiles={n}"] = t
+        for name, t in bench_record(profile_list, repeat).items():
+            cases[f"{name}/profiles={n}"] = t
+    for turns in history_sizes:
+        run_state = make_state(rng, make_history(rng, turns))
+        cases[f"save_state/history={turns}"] = bench_save_state(run_state, repeat)
+        cases[f"history_append/history={turns}"] = bench_history_append(run_state, repeat)
+        if graph:
+            cases[f"update_graph/history={turns}"] = bench_update_graph(run_state, repeat)
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "backend": backend,
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "cases": cases,
+    }
+
+def print_report(report, baseline=None):
+    print(f"commit: {report['commit']}  python {report['python']}  backend: {report.get('backend', 'json')}  "
+          f"(x{report['repeat']} samples)")
+    header = f"  {'Case':46} {'median ms':>10} {'p95':>10}"
+    print(header + (f" {'vs ' + str(baseline.get('commit')):>12}" if baseline else ""))
+    for name, t in report["cases"].items():
+        line = f"  {name:46} {t['median_ms']:10.4f} {t['p95_ms']:10.4f}"
+        old = baseline["cases"].get(name) if baseline else None
+        if old:
+            line += f" {t['median_ms'] / old['median_ms']:11.2f}x"
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the planner, persistence and graph updates.")
+    parser.add_argument("--out", default="core_bench.json", help="Where to write the JSON report")
+    parser.add_argument("--profiles", type=int, nargs="+", default=PROFILE_SIZES,
+                        help="Numbers of trainees in the synthetic profiles.json")
+    parser.add_argument("--history", type=int, nargs="+", default=HISTORY_SIZES,
+                        help="Numbers of turns in the synthetic run histories")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing samples per case")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json",
+                        help="Storage backend for the persistence cases (STORAGE_BACKEND)")
+    parser.add_argument("--no-graph", action="store_true", help="Skip the Qt graph benchmark")
+    parser.add_argument("--compare", help="Earlier report to show the median ratio against")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+    report = run_benchmark(args.profiles, args.history, args.repeat, graph=not args.no_graph,
+                           backend=args.backend)
+    print_report(report, baseline)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.out}")
+
+if __name__ == "__main__":
+    main()
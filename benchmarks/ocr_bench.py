@@ -0,0 +1,169 @@
+"""
+OCR accuracy/latency benchmark.
+
+Runs the OCR pipeline over a directory of saved screenshots. Each image
+needs a ground-truth sidecar with the same stem, e.g. `turn12.png` +
+`turn12.json` holding {"speed": 512, "stamina": 300, ...}.
+
+Frames are replayed through a DirectoryCapture and read with
+ocr.read_stats, so same-sized screenshots reuse the cached panel layout
+the way live scans do. --cold clears it before every read to time the
+full-frame search alone.
+
+    python -m benchmarks.ocr_bench path/to/corpus --out ocr_bench.json
+    python -m benchmarks.ocr_bench path/to/corpus --recognizer components
+    python -m benchmarks.ocr_bench path/to/corpus --repeat 3 --digit-cache
+    python -m benchmarks.ocr_bench path/to/corpus --cold
+
+Results (per-image readings, per-stage timings and per-stat accuracy) are
+written as JSON so runs from different commits can be diffed.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from stat_planner import ocr
+from stat_planner.settings import STATS, DIGIT_CACHE_SIZE
+from stat_planner.utils.capture import IMAGE_EXTS, DirectoryCapture
+from benchmarks.timing import summarize_times, git_commit
+STAGES = ["decode", "equalize", "headers", "digits", "total"]
+
+def load_corpus(corpus_dir):
+    """Ground truth per screenshot, {path: {stat: value}}."""
+    truths = {}
+    for path in sorted(Path(corpus_dir).iterdir()):
+        if path.suffix.lower() not in IMAGE_EXTS:
+            continue
+        truth_path = path.with_suffix(".json")
+        if not truth_path.exists():
+            print(f"[WARN] No ground truth for {path.name}, skipping.")
+            continue
+        with open(truth_path, "r") as f:
+            truths[path] = json.load(f)
+    return truths
+
+def run_one(cold=False):
+    """Read the capture's current frame; the timings exclude decoding."""
+    if cold:
+        ocr.clear_layout_cache()
+    timings = {}
+    t0 = time.perf_counter()
+    detected = ocr.read_stats(timings=timings)
+    timings["total"] = time.perf_counter() - t0
+    return detected, timings
+
+def run_benchmark(corpus_dir, repeat=1, recognizer="template", digit_cache=False, cold=False):
+    ocr.set_digit_recognizer(recognizer)
+    # Off by default: with --repeat every read after the first would be a cache hit
+    ocr.set_digit_cache_size(DIGIT_CACHE_SIZE if digit_cache else 0)
+    ocr.clear_digit_cache()
+    truths = load_corpus(corpus_dir)
+    capture = DirectoryCapture(corpus_dir)
+    previous = ocr.get_capture_backend()
+    ocr.set_capture_backend(capture)
+    stage_times = {s: [] for s in STAGES}
+    per_stat = {s: {"correct": 0, "wrong": 0, "missing": 0} for s in STATS}
+    images = []
+    frames_ok = 0
+    try:
+        while True:
+            t0 = time.perf_counter()
+            if not capture.advance():
+                break
+            decode = time.perf_counter() - t0
+            path = capture.path
+            if path not in truths:
+                continue
+            truth = truths[path]
+            for _ in range(repeat):
+                detected, timings = run_one(cold)
+                timings["decode"] = decode
+                timings["total"] += decode
+                for stage in STAGES:
+                    stage_times[stage].append(timings.get(stage, 0.0))
+            _score(path, truth, detected, timings, per_stat, images)
+            frames_ok += images[-1]["exact"]
+    finally:
+        ocr.set_capture_backend(previous)
+
+    for counts in per_stat.values():
+        n = sum(counts.values())
+        counts["accuracy"] = counts["correct"] / n if n else None
+        counts["failure_rate"] = (counts["wrong"] + counts["missing"]) / n if n else None
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "corpus": str(corpus_dir),
+        "recognizer": recognizer,
+        "cold": cold,
+        "images": len(images),
+        "repeat": repeat,
+        "frame_accuracy": frames_ok / len(images) if images else None,
+        "stages": {s: summarize_times(t) for s, t in stage_times.items()},
+        "per_stat": per_stat,
+        "digit_cache": ocr.digit_cache_stats() if digit_cache else None,
+        "results": images,
+    }
+
+def _score(path, truth, detected, timings, per_stat, images):
+    # Accuracy from the last repeat; readings are deterministic
+    read = detected["values"]
+    for stat in STATS:
+        if stat not in truth:
+            continue
+        if stat not in read:
+            per_stat[stat]["missing"] += 1
+        elif read[stat] == truth[stat]:
+            per_stat[stat]["correct"] += 1
+        else:
+            per_stat[stat]["wrong"] += 1
+    images.append({
+        "image": path.name,
+        "expected": truth,
+        "detected": read,
+        "failed": detected["failed"],
+        "exact": all(read.get(s) == truth[s] for s in STATS if s in truth),
+        "timings_ms": {k: v * 1000 for k, v in timings.items()},
+    })
+
+def print_report(report):
+    print(f"Images: {report['images']}  (x{report['repeat']})  commit: {report['commit']}  "
+          f"recognizer: {report['recognizer']}{'  (cold)' if report.get('cold') else ''}")
+    if report["frame_accuracy"] is not None:
+        print(f"Frame accuracy: {report['frame_accuracy']:.1%}")
+    print(f"  {'Stage':10} {'mean ms':>9} {'median':>9} {'p95':>9}")
+    for stage, t in report["stages"].items():
+        if t:
+            print(f"  {stage:10} {t['mean_ms']:9.2f} {t['median_ms']:9.2f} {t['p95_ms']:9.2f}")
+    print(f"  {'Stat':10} {'acc':>7} {'wrong':>6} {'missing':>8}")
+    for stat, c in report["per_stat"].items():
+        acc = f"{c['accuracy']:.1%}" if c["accuracy"] is not None else "—"
+        print(f"  {stat:10} {acc:>7} {c['wrong']:6} {c['missing']:8}")
+    dc = report.get("digit_cache")
+    if dc:
+        print(f"Digit cache: {dc['hits']} hits, {dc['misses']} misses, ~{dc['saved_ms']:.1f} ms saved")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark OCR accuracy and latency on saved screenshots.")
+    parser.add_argument("corpus", help="Directory of screenshots with ground-truth .json sidecars")
+    parser.add_argument("--out", default="ocr_bench.json", help="Where to write the JSON report")
+    parser.add_argument("--repeat", type=int, default=1, help="Timing repeats per image")
+    parser.add_argument("--recognizer", choices=ocr.DIGIT_RECOGNIZERS, default="template",
+                        help="Digit recognizer to benchmark")
+    parser.add_argument("--digit-cache", action="store_true",
+                        help="Leave the digit region cache on and report its hit rate")
+    parser.add_argument("--cold", action="store_true",
+                        help="Clear the panel layout cache before every read (full-frame search only)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.corpus, repeat=args.repeat, recognizer=args.recognizer,
+                           digit_cache=args.digit_cache, cold=args.cold)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"Report written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Generate a synthetic OCR corpus from the bundled templates.
+
+Each frame pastes the five stat headers and random numbers onto a plain
+background, optionally rescaled, and writes a ground-truth sidecar. Handy
+for smoke-testing benchmarks.ocr_bench without real screenshots; the frames
+are pasted from the same templates the OCR matches against, so accuracy on
+them says nothing about real captures.
+
+    python -m benchmarks.synth_corpus out_dir --count 50
+"""
+import argparse
+import json
+import random
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from stat_planner.assets import load_templates, load_digit_templates
+from stat_planner.settings import STATS
+
+def make_frame(values, templates, digits, size=(1400, 1080), origin=(200, 450), scale=1.0):
+    w, h = size
+    # A horizontal ramp is left roughly unchanged by histogram equalization
+    frame = np.tile(np.linspace(0, 255, w), (h, 1)).astype(np.uint8)
+    x0, y0 = origin
+    # Plain light panel behind the headers and numbers (a guess at the game's, not measured)
+    panel_w = sum(templates[s].shape[1] + 10 for s in STATS) + 10
+    panel_h = 3 * max(t.shape[0] for t in templates.values())
+    frame[max(0, y0-10):y0-10+panel_h, max(0, x0-10):x0-10+panel_w] = 250
+    for i, stat in enumerate(STATS):
+        tmpl = templates[stat]
+        th, tw = tmpl.shape
+        x = x0 + i * (tw + 10)
+        frame[y0:y0+th, x:x+tw] = tmpl
+        dx = x + int(0.45*tw) + 1
+        dy = y0 + th + int(0.1*th) + 1
+        for ch in str(values[stat]):
+            d = digits[ch]
+            frame[dy:dy+d.shape[0], dx:dx+d.shape[1]] = d
+            dx += d.shape[1] + 4
+    if scale != 1.0:
+        interp = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=interp)
+    return frame
+
+def generate(out_dir, count, scales=(1.0,), seed=0):
+    rng = random.Random(seed)
+    templates, digits = load_templates(), load_digit_templates()
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        # Three digits fill the number box; keep values in that range
+        values = {s: rng.randint(10, 999) for s in STATS}
+        origin = (rng.randint(50, 600), rng.randint(50, 900))
+        frame = make_frame(values, templates, digits, origin=origin, scale=rng.choice(scales))
+        cv2.imwrite(str(out / f"synth_{i:04d}.png"), frame)
+        with open(out / f"synth_{i:04d}.json", "w") as f:
+            json.dump(values, f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic OCR benchmark corpus.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    generate(args.out_dir, args.count, tuple(args.scales), args.seed)
+    print(f"Wrote {args.count} frames to {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
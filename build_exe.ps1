@@ -17,7 +17,14 @@ if ($LASTEXITCODE -ne 0) {
 # 3. Clean previous build artifacts
 Remove-Item -Recurse -Force dist, build, main.spec -ErrorAction SilentlyContinue
 
-# 4. Build via package entry-point
+# 4. Pack the template/digit/icon PNGs into the asset bundle loaded at startup
+python -m stat_planner.assets
+if ($LASTEXITCODE -ne 0) {
+    Write-Host "Asset bundle build failed."
+    exit 1
+}
+
+# 5. Build via package entry-point
 pyinstaller --name main --noconfirm --onedir --windowed `
   --add-data "stat_planner/assets;stat_planner/assets" `
   stat_planner/__main__.py
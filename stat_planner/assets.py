@@ -1,9 +1,111 @@
-import cv2
+import os
+import threading
 from pathlib import Path
-from PyQt6.QtGui import QPixmap
-from .settings import TEMPLATE_DIR, DIGIT_TEMPLATE_DIR, ICON_DIR, STATS
+import numpy as np
+from PyQt6.QtGui import QImage, QPixmap
+from .settings import (
+    TEMPLATE_DIR, DIGIT_TEMPLATE_DIR, ICON_DIR, STATS, TEMPLATE_SCALES,
+    ASSET_BUNDLE, ASSET_BUNDLE_VERSION, GLYPH_SIZE, GLYPH_DARK_TEXT
+)
 
+# === Compiled bundle ===
+# Every template, its pyramid levels, the glyph table and the stat icons in
+# one uncompressed .npz, so startup opens one file instead of ~20 PNGs. The
+# images are packed into a single byte blob and handed out as views into it.
+_bundle = False          # False = not opened yet, None = missing/unusable
+_bundle_lock = threading.Lock()
+
+def _key(kind, name, scale=None):
+    return f"{kind}/{name}" if scale is None else f"{kind}/{name}@{scale:g}"
+
+def _source_pngs():
+    return ([TEMPLATE_DIR / f"{s}.png" for s in STATS]
+            + [DIGIT_TEMPLATE_DIR / f"{d}.png" for d in range(10)]
+            + [ICON_DIR / f"{s}.png" for s in STATS])
+
+def load_bundle(path=ASSET_BUNDLE):
+    """The compiled asset bundle, or None if it's missing, stale or another version."""
+    global _bundle
+    if _bundle is not False:
+        return _bundle
+    with _bundle_lock:
+        if _bundle is not False:
+            return _bundle
+        _bundle = _open_bundle(Path(path))
+        return _bundle
+
+def _open_bundle(path):
+    if not path.exists():
+        return None
+    built = path.stat().st_mtime
+    if any(p.exists() and p.stat().st_mtime > built for p in _source_pngs()):
+        print("[WARN] Asset bundle is older than the PNGs, loading PNGs instead. "
+              "Rebuild it with `python -m stat_planner.assets`.")
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version != ASSET_BUNDLE_VERSION:
+                print(f"[WARN] Asset bundle is version {version}, expected {ASSET_BUNDLE_VERSION}; loading PNGs.")
+                return None
+            bundle = {k: data[k] for k in data.files if k.startswith("glyph/")}
+            bundle.update(_unpack(data, "templates"))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] Could not read asset bundle {path}: {e}")
+        return None
+    bundle["path"] = path
+    return bundle
+
+def _bundle_icons():
+    # Icons are most of the bundle's bytes, so they're only read when the GUI asks
+    bundle = load_bundle()
+    if bundle is None:
+        return None
+    try:
+        with np.load(bundle["path"], allow_pickle=False) as data:
+            return _unpack(data, "icons")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] Could not read icons from asset bundle: {e}")
+        return None
+
+def _unpack(data, group):
+    """Views into `group`'s byte blob, keyed like the images passed to _pack."""
+    blob, names, index = data[f"{group}/blob"], data[f"{group}/names"], data[f"{group}/index"]
+    images = {}
+    for name, (offset, h, w, c) in zip(names, index):
+        shape = (h, w, c) if c else (h, w)
+        images[str(name)] = blob[offset:offset + h * w * max(c, 1)].reshape(shape)
+    return images
+
+def _pack(group, images):
+    """Flatten {key: uint8 image} into `group`'s names, (offset, h, w, channels) index and byte blob."""
+    names, index, chunks, offset = [], [], [], 0
+    for key, img in images.items():
+        img = np.ascontiguousarray(img, dtype=np.uint8)
+        h, w = img.shape[:2]
+        names.append(key)
+        index.append((offset, h, w, img.shape[2] if img.ndim == 3 else 0))
+        chunks.append(img.ravel())
+        offset += img.size
+    return {f"{group}/names": np.array(names),
+            f"{group}/index": np.array(index, dtype=np.int64),
+            f"{group}/blob": np.concatenate(chunks) if chunks else np.zeros(0, np.uint8)}
+
+def _from_bundle(kind, names, scale=1.0):
+    bundle = load_bundle()
+    if bundle is None:
+        return None
+    keys = [_key(kind, n, scale) for n in names]
+    if not all(k in bundle for k in keys):
+        return None
+    return {n: bundle[k] for n, k in zip(names, keys)}
+
+# cv2 is imported inside the template loaders so the GUI can start without it
 def load_templates():
+    cached = _from_bundle("stat", STATS)
+    if cached is not None:
+        return cached
+    import cv2
     templates = {}
     for stat in STATS:
         path = TEMPLATE_DIR / f"{stat}.png"
@@ -12,6 +114,10 @@ def load_templates():
     return templates
 
 def load_digit_templates():
+    cached = _from_bundle("digit", [str(d) for d in range(10)])
+    if cached is not None:
+        return cached
+    import cv2
     digit_templates = {}
     for d in range(10):
         path = DIGIT_TEMPLATE_DIR / f"{d}.png"
@@ -19,7 +125,27 @@ def load_digit_templates():
         digit_templates[str(d)] = img
     return digit_templates
 
+# Icons are stored in QPixmap's own premultiplied format so they round-trip exactly
+_ICON_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+def _icon_pixels(path):
+    """Pixels of an image file as a (h, w, 4) uint8 array in _ICON_FORMAT."""
+    img = QImage(str(path)).convertToFormat(_ICON_FORMAT)
+    ptr = img.constBits()
+    ptr.setsize(img.sizeInBytes())
+    rows = np.frombuffer(ptr, np.uint8).reshape(img.height(), img.bytesPerLine())
+    return rows[:, :img.width() * 4].reshape(img.height(), img.width(), 4).copy()
+
+def _icon_pixmap(pixels):
+    h, w, _ = pixels.shape
+    # QImage wraps the buffer without copying and fromImage may share it, so copy once here
+    return QPixmap.fromImage(QImage(pixels.tobytes(), w, h, 4 * w, _ICON_FORMAT).copy())
+
 def load_stat_icons():
+    icons = _bundle_icons()
+    if icons is not None:
+        return {stat: _icon_pixmap(icons[_key("icon", stat)]) if _key("icon", stat) in icons else None
+                for stat in STATS}
     icons = {}
     for stat in STATS:
         path = ICON_DIR / f"{stat}.png"
@@ -29,3 +155,92 @@ def load_stat_icons():
             icons[stat] = None
     return icons
 
+
+def scale_templates(templates, scale):
+    import cv2
+    if scale == 1.0:
+        return dict(templates)
+    interp = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+    scaled = {}
+    for key, img in templates.items():
+        h, w = img.shape
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        scaled[key] = cv2.resize(img, size, interpolation=interp)
+    return scaled
+
+def build_template_pyramid(templates, scales=TEMPLATE_SCALES):
+    """
+    Precompute resized copies of `templates` for every scale.
+    Returns {scale: {key: img}}.
+    """
+    return {scale: scale_templates(templates, scale) for scale in scales}
+
+def load_template_pyramid(kind, templates, scales=TEMPLATE_SCALES):
+    """
+    Like build_template_pyramid, but takes the levels from the asset bundle
+    when it has all of them. `kind` is "stat" or "digit".
+    """
+    pyramid = {}
+    for scale in scales:
+        level = _from_bundle(kind, list(templates), scale)
+        if level is None:
+            return build_template_pyramid(templates, scales)
+        pyramid[scale] = level
+    return pyramid
+
+def _glyph_params():
+    return np.array([*GLYPH_SIZE, int(GLYPH_DARK_TEXT)])
+
+def load_glyph_table(digit_templates):
+    """The glyph classifier table from the bundle, or built from `digit_templates`."""
+    bundle = load_bundle()
+    if bundle is not None and "glyph/features" in bundle \
+            and np.array_equal(bundle["glyph/params"], _glyph_params()):
+        return [str(l) for l in bundle["glyph/labels"]], bundle["glyph/features"], float(bundle["glyph/height"])
+    from .glyphs import build_glyph_table
+    return build_glyph_table(digit_templates)
+
+def build_asset_bundle(path=ASSET_BUNDLE, scales=TEMPLATE_SCALES):
+    """Decode every PNG asset, precompute the derived tables and pack them into `path`."""
+    global _bundle
+    _bundle = None   # Build from the PNGs, not from an older bundle
+    stat_templates = load_templates()
+    digit_templates = load_digit_templates()
+    images, icons = {}, {}
+    for kind, templates in (("stat", stat_templates), ("digit", digit_templates)):
+        for name, img in templates.items():
+            images[_key(kind, name, 1.0)] = img
+        for scale, level in build_template_pyramid(templates, scales).items():
+            for name, img in level.items():
+                images[_key(kind, name, scale)] = img
+    for stat in STATS:
+        icon = ICON_DIR / f"{stat}.png"
+        if icon.exists():
+            icons[_key("icon", stat)] = _icon_pixels(icon)
+    labels, features, height = load_glyph_table(digit_templates)
+    arrays = {
+        "version": np.array(ASSET_BUNDLE_VERSION),
+        **_pack("templates", images), **_pack("icons", icons),
+        "glyph/labels": np.array(labels), "glyph/features": features,
+        "glyph/height": np.array(height), "glyph/params": _glyph_params(),
+    }
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)   # Uncompressed: members load without inflating
+    os.replace(tmp, path)
+    _bundle = False
+    return path, len(images) + len(icons)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m stat_planner.assets",
+        description="Pack the template, digit and icon PNGs into one asset bundle.")
+    parser.add_argument("-o", "--out", default=str(ASSET_BUNDLE), help="Bundle path (default: %(default)s)")
+    args = parser.parse_args(argv)
+    path, count = build_asset_bundle(args.out)
+    print(f"[INFO] Packed {count} images into {path} ({path.stat().st_size / 1024:.0f} KiB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+SQLite storage for profiles, analytics and the saved run.
+
+Used in place of profiles.json / run_state.json when STORAGE_BACKEND is
+"sqlite". profiles.py and state.py keep their functions and call into
+here, so the rest of the app doesn't change. Writes are transactions over
+the rows that changed: flushing one trainee rewrites that trainee's rows
+only, and saving a run appends just the turns added since the last save.
+
+    python -m stat_planner.database import     # profiles.json + run_state.json -> stat_planner.db
+"""
+import hashlib
+import json
+import sqlite3
+from .settings import STATS, DATABASE_FILE
+from .history import as_history
+
+_STAT_COLUMNS = ", ".join(f"{s} INTEGER NOT NULL" for s in STATS)
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS profiles (
+    idx         INTEGER PRIMARY KEY,    -- position in the profile list (profile_index)
+    name        TEXT NOT NULL,
+    ideal_stats TEXT NOT NULL,          -- JSON
+    photo       TEXT,
+    extra       TEXT                    -- JSON: any other profile or analytics keys
+);
+CREATE TABLE IF NOT EXISTS action_stats (
+    profile INTEGER NOT NULL,
+    action  TEXT NOT NULL,
+    bucket  TEXT NOT NULL,              -- '' for all turns, else the turn bucket
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (profile, action, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS action_gains (
+    profile INTEGER NOT NULL,
+    action  TEXT NOT NULL,
+    bucket  TEXT NOT NULL,
+    stat    TEXT NOT NULL,
+    total   INTEGER NOT NULL,           -- summed gains
+    n       INTEGER NOT NULL,           -- streaming summary (see profiles.gain_stats)
+    mean    REAL NOT NULL,
+    m2      REAL NOT NULL,
+    min     INTEGER,
+    max     INTEGER,
+    PRIMARY KEY (profile, action, bucket, stat)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS feedback (
+    profile INTEGER NOT NULL,
+    kind    TEXT NOT NULL,              -- 'optional' or 'loss'
+    stat    TEXT NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (profile, kind, stat)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS loss_reasons (
+    profile INTEGER NOT NULL,
+    stat    TEXT NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (profile, stat)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS run_state (
+    key     TEXT PRIMARY KEY,
+    value   TEXT NOT NULL               -- JSON
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS run_history (
+    turn    INTEGER PRIMARY KEY,        -- 0-based position in the history
+    {_STAT_COLUMNS}
+);
+"""
+FEEDBACK_KINDS = {"optional_feedback": "optional", "loss_feedback": "loss"}
+_PROFILE_TABLES = ["action_stats", "action_gains", "feedback", "loss_reasons"]
+_HISTORY_DIGEST = "_history_digest"   # run_state key: hash of the stored history rows
+
+# Stored as PRAGMA user_version. To change the schema: bump SCHEMA_VERSION,
+# update SCHEMA for new databases and add MIGRATIONS[old version] to bring
+# an existing one up by one version.
+SCHEMA_VERSION = 1
+MIGRATIONS = {
+    0: lambda conn: None,   # Databases from before versioning already have the v1 tables
+}
+
+_conn = None
+_stored_names = None   # Profile names by idx as last written or read, so flushes don't re-query them
+
+def _migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"{DATABASE_FILE.name} is schema v{version}; this version of the app reads "
+                           f"up to v{SCHEMA_VERSION}")
+    with conn:
+        for v in range(version, SCHEMA_VERSION):
+            MIGRATIONS[v](conn)
+            print(f"[INFO] Migrated {DATABASE_FILE.name} to schema v{v + 1}")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def connect():
+    """The shared connection to DATABASE_FILE, created (or migrated) on first use."""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(DATABASE_FILE)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        fresh = conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0
+        conn.executescript(SCHEMA)
+        if fresh:
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        else:
+            _migrate(conn)
+        _conn = conn
+    return _conn
+
+def close():
+    global _conn, _stored_names
+    _stored_names = None
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+
+# === Profiles ===
+
+def _profile_rows(idx, profile):
+    """One profile as (its profiles row, {table: rows} for the analytics tables)."""
+    profile = dict(profile)
+    analytics = dict(profile.pop("analytics", {}))
+    rows = {t: [] for t in _PROFILE_TABLES}
+    for action, record in analytics.pop("action_stats", {}).items():
+        records = [("", record)] + list(record.get("buckets", {}).items())
+        for bucket, r in records:
+            rows["action_stats"].append((idx, action, bucket, r["count"]))
+            summaries = r.get("summary", {})
+            for stat, total in r["gains"].items():
+                s = summaries.get(stat) or {"n": 0, "mean": 0.0, "m2": 0.0, "min": None, "max": None}
+                rows["action_gains"].append(
+                    (idx, action, bucket, stat, total, s["n"], s["mean"], s["m2"], s["min"], s["max"]))
+    for key, kind in FEEDBACK_KINDS.items():
+        for stat, count in analytics.pop(key, {}).items():
+            rows["feedback"].append((idx, kind, stat, count))
+    for stat, count in analytics.pop("loss_reasons", {}).items():
+        rows["loss_reasons"].append((idx, stat, count))
+    name, ideal, photo = profile.pop("name"), profile.pop("ideal_stats"), profile.pop("photo", None)
+    if analytics:
+        profile["analytics"] = analytics
+    profile_row = (idx, name, json.dumps(ideal), photo, json.dumps(profile) if profile else None)
+    return profile_row, rows
+
+def _write_profile(conn, idx, profile):
+    profile_row, rows = _profile_rows(idx, profile)
+    conn.execute("""INSERT INTO profiles (idx, name, ideal_stats, photo, extra) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(idx) DO UPDATE SET name=excluded.name, ideal_stats=excluded.ideal_stats,
+                    photo=excluded.photo, extra=excluded.extra""", profile_row)
+    for table in _PROFILE_TABLES:
+        conn.execute(f"DELETE FROM {table} WHERE profile = ?", (idx,))
+        if rows[table]:
+            marks = ", ".join("?" * len(rows[table][0]))
+            conn.executemany(f"INSERT INTO {table} VALUES ({marks})", rows[table])
+
+def _same_layout(conn, profiles, indices):
+    """
+    Whether the stored rows still line up with `profiles` by position, apart
+    from `indices`. Rows are keyed by list index, so after a profile was
+    removed or the list reordered only a full rewrite is safe.
+    """
+    stored = _stored_names
+    if stored is None:
+        stored = [name for _, name in conn.execute("SELECT idx, name FROM profiles ORDER BY idx")]
+    if len(stored) != len(profiles):
+        return False
+    return all(stored[i] == p["name"] for i, p in enumerate(profiles) if i not in indices)
+
+def save_profiles(profiles, indices=None):
+    """
+    Write `indices` of `profiles` in one transaction. All of them are written
+    if `indices` is None or the list no longer matches the stored profiles
+    position by position.
+    """
+    global _stored_names
+    conn = connect()
+    with conn:
+        if indices is not None and not _same_layout(conn, profiles, indices):
+            print("[INFO] Profile list changed shape; rewriting every profile.")
+            indices = None
+        if indices is None:
+            indices = range(len(profiles))
+            for table in ["profiles", *_PROFILE_TABLES]:
+                column = "idx" if table == "profiles" else "profile"
+                conn.execute(f"DELETE FROM {table} WHERE {column} >= ?", (len(profiles),))
+        for idx in sorted(indices):
+            _write_profile(conn, idx, profiles[idx])
+    _stored_names = [p["name"] for p in profiles]
+
+def load_profiles():
+    # One pass over each table; rows come back in primary-key order, so the
+    # whole-run record ('' bucket) of an action is always seen before its buckets
+    global _stored_names
+    conn = connect()
+    profiles, analytics = {}, {}
+    for idx, name, ideal, photo, extra in conn.execute("SELECT * FROM profiles ORDER BY idx"):
+        profile = {"name": name, "ideal_stats": json.loads(ideal), "photo": photo}
+        extra = json.loads(extra) if extra else {}
+        analytics[idx] = extra.pop("analytics", {})
+        profile.update(extra)
+        profiles[idx] = profile
+    records = {}
+    for idx, action, bucket, count in conn.execute("SELECT * FROM action_stats"):
+        record = records[idx, action, bucket] = {"count": count, "gains": {}, "summary": {}}
+        action_stats = analytics[idx].setdefault("action_stats", {})
+        if bucket:
+            action_stats[action].setdefault("buckets", {})[bucket] = record
+        else:
+            action_stats[action] = record
+    for idx, action, bucket, stat, total, n, mean, m2, lo, hi in conn.execute("SELECT * FROM action_gains"):
+        record = records[idx, action, bucket]
+        record["gains"][stat] = total
+        record["summary"][stat] = {"n": n, "mean": mean, "m2": m2, "min": lo, "max": hi}
+    for idx, kind, stat, count in conn.execute("SELECT * FROM feedback"):
+        analytics[idx].setdefault(f"{kind}_feedback", {})[stat] = count
+    for idx, stat, count in conn.execute("SELECT * FROM loss_reasons"):
+        analytics[idx].setdefault("loss_reasons", {})[stat] = count
+    for idx, profile in profiles.items():
+        if analytics[idx]:
+            profile["analytics"] = analytics[idx]
+    _stored_names = [p["name"] for p in profiles.values()]
+    return list(profiles.values())
+
+# === Run state ===
+
+def _history_rows(history, start=0):
+    return [(turn, *(row[s] for s in STATS)) for turn, row in enumerate(history[start:], start)]
+
+def _digest(rows):
+    return hashlib.blake2b(rows.tobytes(), digest_size=16).hexdigest()
+
+def save_state(state):
+    """
+    Save the run. History rows already stored are kept when they're still a
+    prefix of `state["history"]` (checked against a hash of every stored
+    row, kept in run_state), so a save per turn inserts one row.
+    """
+    history = state.get("history", [])
+    rows = as_history(history).array
+    columns = ", ".join(STATS)
+    marks = ", ".join("?" * (len(STATS) + 1))
+    conn = connect()
+    with conn:
+        stored = conn.execute("SELECT COUNT(*) FROM run_history").fetchone()[0]
+        digest = conn.execute("SELECT value FROM run_state WHERE key = ?", (_HISTORY_DIGEST,)).fetchone()
+        start = 0
+        if 0 < stored <= len(rows) and digest and json.loads(digest[0]) == _digest(rows[:stored]):
+            start = stored
+        if start == 0:
+            conn.execute("DELETE FROM run_history")
+        conn.executemany(f"INSERT INTO run_history (turn, {columns}) VALUES ({marks})",
+                         _history_rows(history, start))
+        conn.execute("DELETE FROM run_state")
+        conn.executemany("INSERT INTO run_state VALUES (?, ?)",
+                         [(k, json.dumps(v)) for k, v in state.items() if k != "history"] +
+                         [(_HISTORY_DIGEST, json.dumps(_digest(rows)))])
+
+def load_state():
+    conn = connect()
+    rows = conn.execute("SELECT key, value FROM run_state").fetchall()
+    if not rows:
+        return None
+    state = {k: json.loads(v) for k, v in rows if k != _HISTORY_DIGEST}
+    state["history"] = [dict(zip(STATS, row)) for row in
+                        conn.execute(f"SELECT {', '.join(STATS)} FROM run_history ORDER BY turn")]
+    return state
+
+def has_state():
+    return connect().execute("SELECT 1 FROM run_state LIMIT 1").fetchone() is not None
+
+def clear_state():
+    conn = connect()
+    with conn:
+        conn.execute("DELETE FROM run_state")
+        conn.execute("DELETE FROM run_history")
+
+# === Import ===
+
+def import_json(profiles_path=None, state_path=None):
+    """One-shot copy of profiles.json and run_state.json into the database. Returns what was imported."""
+    from .profiles import PROFILES_FILE
+    from .state import STATE_FILE
+    imported = {}
+    profiles_path = profiles_path or PROFILES_FILE
+    if profiles_path.exists():
+        with open(profiles_path, "r") as f:
+            profiles = json.load(f)
+        save_profiles(profiles)
+        imported["profiles"] = len(profiles)
+    state_path = state_path or STATE_FILE
+    if state_path.exists():
+        with open(state_path, "r") as f:
+            state = json.load(f)
+        save_state(state)
+        imported["history"] = len(state.get("history", []))
+    return imported
+
+def main(argv=None):
+    import argparse
+    from pathlib import Path
+    parser = argparse.ArgumentParser(prog="python -m stat_planner.database",
+                                     description="Manage the SQLite store (STORAGE_BACKEND = \"sqlite\").")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Copy profiles.json and run_state.json into the database")
+    imp.add_argument("--profiles", type=Path, help="profiles.json to import (default: the app's)")
+    imp.add_argument("--state", type=Path, help="run_state.json to import (default: the app's)")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        imported = import_json(args.profiles, args.state)
+        if not imported:
+            print("[WARN] Nothing to import.")
+            return
+        print(f"[INFO] Imported {imported.get('profiles', 0)} profiles and {imported.get('history', 0)} "
+              f"turns of run history into {DATABASE_FILE.name}")
+        print('[INFO] Set STORAGE_BACKEND = "sqlite" in settings.py to use it.')
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ from pptx import Presentation
 from pptx.util import Inches
 from io import BytesIO
 import matplotlib.pyplot as plt
+from .settings import STATS
+from .history import as_history
 
 def export_run_summary(history, ideal_stats, trainee_name, trainee_photo_path=None):
     prs = Presentation()
@@ -13,11 +15,11 @@ def export_run_summary(history, ideal_stats, trainee_name, trainee_photo_path=No
     slide.placeholders[1].text = "Generated by Stat Planner"
 
     # Stats Over Time plot
+    history = as_history(history)
     turns = list(range(1, len(history) + 1))
     fig, ax = plt.subplots()
-    for stat in history[0]:
-        values = [h[stat] for h in history]
-        ax.plot(turns, values, label=stat.capitalize())
+    for stat in STATS:
+        ax.plot(turns, history.column(stat), label=stat.capitalize())
     ax.set_xlabel("Turn")
     ax.set_ylabel("Stat Value")
     ax.legend()
@@ -31,9 +33,8 @@ def export_run_summary(history, ideal_stats, trainee_name, trainee_photo_path=No
 
     # Gap to Ideal plot
     fig2, ax2 = plt.subplots()
-    for stat in history[0]:
-        gap_vals = [ideal_stats[stat] - h[stat] for h in history]
-        ax2.plot(turns, gap_vals, label=stat.capitalize())
+    for stat in STATS:
+        ax2.plot(turns, ideal_stats[stat] - history.column(stat), label=stat.capitalize())
     ax2.set_xlabel("Turn")
     ax2.set_ylabel("Gap to Ideal")
     ax2.legend()
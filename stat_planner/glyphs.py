@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+from .settings import (
+    GLYPH_SIZE, GLYPH_MIN_HEIGHT, GLYPH_MAX_HEIGHT, GLYPH_MIN_SCORE, GLYPH_DARK_TEXT, MAX_STAT_VALUE
+)
+
+def binarize(region, dark_text=GLYPH_DARK_TEXT):
+    """
+    Otsu threshold with glyph pixels set to 1. Also returns the matching
+    "ink" image: 0 for background, 1 for the strongest stroke, with
+    anti-aliased edges in between.
+    """
+    _, mask = cv2.threshold(region, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    ink = region.astype(np.float32)
+    lo, hi = float(ink.min()), float(ink.max())
+    ink = (hi - ink) / (hi - lo) if hi > lo else np.zeros_like(ink)
+    if not dark_text:
+        mask, ink = 1 - mask, 1.0 - ink
+    return mask, ink
+
+def glyph_features(ink):
+    """
+    Normalize a glyph's ink patch to a unit-length GLYPH_SIZE vector. The
+    patch is centered on a canvas of fixed aspect ratio first so narrow
+    digits like 1 keep their shape instead of being stretched.
+    """
+    gw, gh = GLYPH_SIZE
+    h, w = ink.shape
+    canvas_w = max(w, int(round(h * gw / gh)))
+    canvas_h = max(h, int(round(canvas_w * gh / gw)))
+    canvas = np.zeros((canvas_h, canvas_w), dtype=np.float32)
+    y0, x0 = (canvas_h - h) // 2, (canvas_w - w) // 2
+    canvas[y0:y0+h, x0:x0+w] = ink
+    vec = cv2.resize(canvas, GLYPH_SIZE, interpolation=cv2.INTER_AREA).ravel()
+    vec -= vec.mean()
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+def _components(mask, ink):
+    """Yield (x, y, w, h, ink patch) per connected component, ink outside it zeroed."""
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(mask.astype(np.uint8), connectivity=8)
+    for i in range(1, n):
+        x, y, w, h = stats[i, :4]
+        own = (labels[y:y+h, x:x+w] == i).astype(np.uint8)
+        # Keep the anti-aliased rim that Otsu cut off
+        own = cv2.dilate(own, np.ones((3, 3), np.uint8))
+        yield x, y, w, h, ink[y:y+h, x:x+w] * own
+
+def build_glyph_table(digit_templates):
+    """
+    Precompute one feature row per digit template.
+    Returns (labels, features, template_height).
+    """
+    labels, rows, heights = [], [], []
+    for digit, tmpl in digit_templates.items():
+        mask, ink = binarize(tmpl)
+        # The largest component is the digit itself
+        glyph = max(_components(mask, ink), key=lambda c: c[2] * c[3])
+        labels.append(digit)
+        rows.append(glyph_features(glyph[4]))
+        heights.append(glyph[3])
+    return labels, np.stack(rows), float(np.median(heights))
+
+def classify_digits(region, table, scale=1.0, debug=False, stat_name=""):
+    """
+    Read the number in `region` by splitting it into connected components
+    and matching each against the glyph table by cosine similarity.
+    Returns (value, scores) like ocr.match_digits_scored.
+    """
+    labels, features, ref_h = table
+    if region.size == 0:
+        return None, []
+    mask, ink = binarize(region)
+    lo, hi = GLYPH_MIN_HEIGHT * ref_h * scale, GLYPH_MAX_HEIGHT * ref_h * scale
+    glyphs = sorted((c for c in _components(mask, ink) if lo <= c[3] <= hi), key=lambda c: c[0])
+    if not glyphs:
+        return None, []
+
+    feats = np.stack([glyph_features(c[4]) for c in glyphs])
+    sims = feats @ features.T            # every glyph against every digit at once
+    best = sims.argmax(axis=1)
+    scores = [float(s) for s in sims[np.arange(len(best)), best]]
+    number = "".join(labels[b] for b in best)
+    if debug:
+        print(f"[DEBUG] {stat_name or 'region'} glyphs: {number} scores: {[round(s, 3) for s in scores]}")
+    if min(scores) < GLYPH_MIN_SCORE or int(number) > MAX_STAT_VALUE:
+        return None, scores
+    return int(number), scores
@@ -2,12 +2,15 @@ from PyQt6.QtWidgets import QMessageBox, QInputDialog
 from pathlib import Path
 from stat_planner.planner import suggest_training, race_stage
 from stat_planner.settings import STATS, PHOTOS_DIR
-from stat_planner.state import STATE_FILE
-from stat_planner.exporter import export_run_summary
+from stat_planner.state import has_state, clear_state
+from stat_planner.gui.state_ui import autosave
 
 def train_action(gui):
-    choice, reason, debug_weights = suggest_training(gui.current_stats, gui.ideal_stats, gui.turns_left, gui.feedback_stat)
+    lookahead = hasattr(gui, "lookahead_toggle") and gui.lookahead_toggle.isChecked()
+    choice, reason, debug_weights = suggest_training(gui.current_stats, gui.ideal_stats, gui.turns_left,
+                                                     gui.feedback_stat, lookahead=lookahead)
     gui.last_action = choice
+    autosave(gui, "action", action=choice)
     gui.log(f"📌 Train {choice.capitalize()} — {reason}")
     # Show calculation breakdown for user clarity
     lines = ["Calculation details:"]
@@ -26,6 +29,8 @@ def train_action(gui):
 
 def recover_action(gui):
     gui.log("💤 Recovery turn")
+    gui.last_action = "recover"
+    autosave(gui, "action", action="recover")
     advance_turn(gui)
 
 def race_action(gui):
@@ -58,18 +63,13 @@ def race_action(gui):
             if ok2 and stat.lower() in STATS:
                 idx = gui.profile_select.currentIndex()-1 if gui.profile_select.currentIndex()>0 else None
                 if idx is not None:
-                    from stat_planner.profiles import load_profiles, save_profiles
-                    profiles = load_profiles()
-                    profile = profiles[idx]
-                    analytics = profile.setdefault("analytics", {})
-                    loss_reasons = analytics.setdefault("loss_reasons", {})
-                    loss_reasons[stat.lower()] = loss_reasons.get(stat.lower(), 0) + 1
-                    save_profiles(profiles)
-                    gui.log(f"📈 Recorded loss reason: {stat.capitalize()} for {profile['name']}")
+                    from stat_planner.profiles import get_profile, record_loss_reason
+                    record_loss_reason(idx, stat.lower())
+                    gui.log(f"📈 Recorded loss reason: {stat.capitalize()} for {get_profile(idx)['name']}")
             gui.log("❌ Mandatory race lost—run over.")
-            if STATE_FILE.exists():
+            if has_state():
                 try:
-                    STATE_FILE.unlink()
+                    clear_state()
                     gui.load_state_btn.setEnabled(False)
                     gui.log("🗑️ Cleared saved run state.")
                 except Exception as e:
@@ -78,6 +78,7 @@ def race_action(gui):
             return
     gui.turns_left -= 1
     gui.turn += 1
+    autosave(gui, "race", stage=stage, won=first == "Yes")
     if hasattr(gui, 'update_rounds_turns_fields'):
         gui.update_rounds_turns_fields()
     prepare_next_turn(gui)
@@ -104,12 +105,13 @@ def handle_race_stage(gui):
             gui.total_rounds -= 1
             if hasattr(gui, 'update_rounds_turns_fields'):
                 gui.update_rounds_turns_fields()
+        autosave(gui, "race", stage=stage, won=True)
         next_stage = race_stage(gui.rounds_done, gui.total_rounds)
         if next_stage == "End":
             QMessageBox.information(gui, "Done", "🏆 Final complete!")
-            if STATE_FILE.exists():
+            if has_state():
                 try:
-                    STATE_FILE.unlink()
+                    clear_state()
                     gui.load_state_btn.setEnabled(False)
                     gui.log("🗑️ Cleared saved run state.")
                 except Exception as e:
@@ -131,18 +133,13 @@ def handle_race_stage(gui):
         if ok2 and stat.lower() in STATS:
             idx = gui.profile_select.currentIndex()-1 if gui.profile_select.currentIndex()>0 else None
             if idx is not None:
-                from stat_planner.profiles import load_profiles, save_profiles
-                profiles = load_profiles()
-                profile = profiles[idx]
-                analytics = profile.setdefault("analytics", {})
-                loss_reasons = analytics.setdefault("loss_reasons", {})
-                loss_reasons[stat.lower()] = loss_reasons.get(stat.lower(), 0) + 1
-                save_profiles(profiles)
-                gui.log(f"📈 Recorded loss reason: {stat.capitalize()} for {profile['name']}")
+                from stat_planner.profiles import get_profile, record_loss_reason
+                record_loss_reason(idx, stat.lower())
+                gui.log(f"📈 Recorded loss reason: {stat.capitalize()} for {get_profile(idx)['name']}")
         QMessageBox.information(gui, "Run Over", "❌ Run ended.")
-        if STATE_FILE.exists():
+        if has_state():
             try:
-                STATE_FILE.unlink()
+                clear_state()
                 gui.load_state_btn.setEnabled(False)
                 gui.log("🗑️ Cleared saved run state.")
             except Exception as e:
@@ -157,6 +154,10 @@ def prepare_next_turn(gui):
     for s in STATS:
         gui.detected_inputs[s].clear()
         gui.detected_inputs[s].setEnabled(False)
+    gui.scan_failed = []
+    from stat_planner.profiles import flush_profiles
+    flush_profiles()
+    autosave(gui, "ready")
     if hasattr(gui, 'update_rounds_turns_fields'):
         gui.update_rounds_turns_fields()
     gui.log(f"🔄 Ready for turn {gui.turn}  •  {gui.turns_left} turns left until next race")
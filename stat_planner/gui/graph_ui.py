@@ -1,3 +1,4 @@
+import numpy as np
 import pyqtgraph as pg
 from PyQt6.QtCore import Qt
 from stat_planner.settings import STATS
@@ -23,9 +24,8 @@ def setup_graphs(gui):
     gui.main_layout.addWidget(gui.gap_graph)
 
 def update_graph(gui):
-    x = list(range(1, len(gui.history)+1))
+    x = np.arange(1, len(gui.history)+1)
     for s in STATS:
-        y = [h[s] for h in gui.history]
+        y = gui.history.column(s)
         gui.graph_curves[s].setData(x, y)
-        gap_values = [gui.ideal_stats[s] - val for val in y]
-        gui.gap_curves[s].setData(x, gap_values)
+        gui.gap_curves[s].setData(x, gui.ideal_stats[s] - y)
@@ -4,15 +4,14 @@ from PyQt6.QtGui import QIntValidator, QPixmap
 from PyQt6.QtCore import Qt
 from pathlib import Path
 from stat_planner.settings import STATS, PHOTOS_DIR
-from stat_planner.profiles import add_profile, load_profiles, save_profiles
+from stat_planner.profiles import add_profile, get_profiles, clear_analytics as clear_profile_analytics
 
 def show_edit_profile_dialog(gui):
     idx = gui.profile_select.currentIndex() - 1
     if idx < 0:
         QMessageBox.information(gui, "Edit Profile", "Select a trainee to edit.")
         return
-    profiles = load_profiles()
-    profile = profiles[idx]
+    profile = get_profiles()[idx]
     dlg = QDialog(gui)
     dlg.setWindowTitle(f"Edit Trainee: {profile['name']}")
     form = QFormLayout(dlg)
@@ -31,10 +30,9 @@ def show_edit_profile_dialog(gui):
     clear_btn = QPushButton("Clear Analytics (Loss Reasons & Action Stats)")
     def clear_analytics():
         if QMessageBox.question(gui, "Confirm", "Clear all analytics for this profile?") == QMessageBox.StandardButton.Yes:
-            profiles[idx]['analytics'] = {}
-            save_profiles(profiles)
-            # Reload profiles and reselect current trainee to update UI
-            gui.profiles = load_profiles()
+            clear_profile_analytics(idx)
+            # Reselect current trainee to update UI
+            gui.profiles = get_profiles()
             gui.profile_select.setCurrentIndex(idx + 1)  # +1 for the 'Select Trainee' entry
             QMessageBox.information(gui, "Cleared", "Analytics cleared.")
             dlg.accept()
@@ -1,37 +1,112 @@
 from PyQt6.QtWidgets import QMessageBox
-from stat_planner.ocr import auto_read_stats
-from stat_planner.settings import STATS
+from stat_planner.settings import (
+    STATS, PLAUSIBLE_AUTO_CONFIRM, PLAUSIBLE_AUTO_CONFIRM_SAMPLES, PLAUSIBLE_MIN_SAMPLES
+)
+from stat_planner.gui.state_ui import autosave
+
+def _expected_ranges(gui):
+    """
+    Plausible range per stat from last turn's stats and the gains learned for
+    the last action, and how many recorded turns those gains come from.
+    """
+    if not gui.history:
+        return None, 0
+    gain_record = None
+    idx = gui.profile_select.currentIndex() - 1
+    if gui.last_action and idx >= 0:
+        from stat_planner.profiles import get_profile, bucket_record
+        profile = get_profile(idx)
+        gain_record = profile.get("analytics", {}).get("action_stats", {}).get(gui.last_action)
+        # Gains at this point of the run, once enough of them are recorded
+        bucket = bucket_record(gain_record, gui.turn)
+        if bucket and bucket["count"] >= PLAUSIBLE_MIN_SAMPLES:
+            gain_record = bucket
+    from stat_planner.ocr import expected_ranges
+    samples = gain_record["count"] if gain_record else 0
+    return expected_ranges(gui.history[-1], gain_record), samples
 
 def scan_stats(gui):
     gui.log(f"[DEBUG] scan_stats called. turn={gui.turn}")
     if gui.turn == 0 and not gui.initialize_run():
         gui.log("[DEBUG] scan_stats: initialize_run failed or cancelled.")
         return
-    gui.log("📸 Scanning...")
-    stats = auto_read_stats(debug=gui.debug_toggle.isChecked())
-    if not stats:
-        gui.log("⚠️ Scan failed. Enter manually.")
+    retry = list(getattr(gui, "scan_failed", []))
+    if retry:
+        gui.log(f"📸 Re-scanning {', '.join(s.capitalize() for s in retry)}...")
+    else:
+        gui.log("📸 Scanning...")
+    from stat_planner.ocr import read_stats
+    expected, samples = _expected_ranges(gui)
+    result = read_stats(debug=gui.debug_toggle.isChecked(), only=retry or None, expected=expected)
+    if gui.debug_toggle.isChecked():
+        from stat_planner.utils.screenshot import window_lookup_stats
+        ws = window_lookup_stats()
+        gui.log(f"[DEBUG] Window lookup: {ws['last_ms']:.1f} ms "
+                f"({ws['full_scans']} full scans, {ws['cache_hits']} cached)")
+        from stat_planner.ocr import digit_cache_stats
+        dc = digit_cache_stats()
+        gui.log(f"[DEBUG] Digit cache: {dc['hits']} hits, {dc['misses']} misses "
+                f"(~{dc['saved_ms']:.0f} ms of matching saved)")
+        conf = ", ".join(f"{s}: {c:.2f}" for s, c in result["confidence"].items())
+        gui.log(f"[DEBUG] Scan confidence: {conf or '—'}")
+    # Keep what was read (this scan or an earlier one this turn); only the
+    # failed stats are left for manual entry or the next targeted re-scan
+    for s, val in result["values"].items():
+        gui.detected_inputs[s].setText(str(val))
+    gui.scan_failed = result["failed"]
+    for s, val in result["implausible"].items():
+        lo, hi = expected[s]
+        gui.log(f"⚠️ {s.capitalize()} read as {val}, expected {lo}–{hi}.")
+    # A targeted re-scan only refills the stats it re-read; the others must
+    # still hold a number from earlier (the user may have edited them since)
+    failed = list(result["failed"])
+    for s in STATS:
+        if s not in failed and s not in result["values"]:
+            try:
+                int(gui.detected_inputs[s].text())
+            except ValueError:
+                failed.append(s)
+    if failed:
+        failed = [s for s in STATS if s in failed]
+        gui.scan_failed = failed
+        names = ", ".join(s.capitalize() for s in failed)
+        gui.log(f"⚠️ Couldn't read {names}. Enter manually or scan again to retry just those.")
         for s in STATS:
-            gui.detected_inputs[s].clear()
             gui.detected_inputs[s].setEnabled(True)
+        for s in failed:
+            gui.detected_inputs[s].clear()
         gui.confirm_btn.setEnabled(True)
-        gui.log("[DEBUG] scan_stats: scan failed, manual entry enabled.")
+        gui.log("[DEBUG] scan_stats: partial scan, manual entry enabled.")
         return
+    stats = {s: int(gui.detected_inputs[s].text()) for s in STATS}
+    apply_scanned_stats(gui, stats)
+    gui.log("✅ Scan complete.")
+    # Skip the confirm step only when nothing was in doubt: every stat read
+    # first time, inside a range learned from enough turns of this action
+    in_range = expected and all(expected[s][0] <= stats[s] <= expected[s][1] for s in STATS)
+    if (PLAUSIBLE_AUTO_CONFIRM and in_range and samples >= PLAUSIBLE_AUTO_CONFIRM_SAMPLES
+            and not retry and not result["retried"]):
+        gui.log("✅ All readings within expected ranges.")
+        confirm_stats(gui)
+
+def apply_scanned_stats(gui, stats):
     gui.current_stats = stats
     for s, val in stats.items():
         gui.detected_inputs[s].setText(str(val))
         gui.detected_inputs[s].setEnabled(True)
     if gui.last_action and gui.prev_stats:
-        from ..profiles import record_action_gain
         idx = gui.profile_select.currentIndex() - 1
-        record_action_gain(idx, gui.last_action, gui.prev_stats, stats)
-        gui.log(f"💾 Learned gains for {gui.last_action}")
+        # No trainee selected: nothing to learn into (-1 would be the last profile)
+        if idx >= 0:
+            from ..profiles import record_action_gain, flush_profiles
+            record_action_gain(idx, gui.last_action, gui.prev_stats, stats, gui.turn)
+            flush_profiles()   # On disk now, not only once the turn is finished
+            gui.log(f"💾 Learned gains for {gui.last_action}")
         gui.last_action = None
         gui.prev_stats  = None
     gui.confirm_btn.setEnabled(True)
     gui.train_btn.setEnabled(False)
     gui.recover_btn.setEnabled(False)
-    gui.log("✅ Scan complete.")
 
 def confirm_stats(gui):
     gui.log("[DEBUG] confirm_stats called.")
@@ -41,7 +116,8 @@ def confirm_stats(gui):
         gui.log(f"[DEBUG] confirm_stats error: {e}")
         QMessageBox.warning(gui, "Input Error", "Enter valid ints.")
         return
-    gui.history.append(gui.current_stats.copy())
+    gui.history.append(gui.current_stats)
+    autosave(gui, "turn", stats=gui.current_stats)
     gui.log(f"[DEBUG] confirm_stats: current_stats set to {gui.current_stats}")
     gui.update_graph()
     gui.log(f"✅ Stats confirmed: {gui.current_stats}")
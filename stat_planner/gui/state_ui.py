@@ -1,8 +1,10 @@
 from PyQt6.QtWidgets import QMessageBox
-from stat_planner.state import save_state, load_state, STATE_FILE
-from stat_planner.settings import STATS
+from stat_planner.state import load_state, has_state
+from stat_planner.settings import STATS, AUTOSAVE
+from stat_planner.history import RunHistory
+from stat_planner import journal
 
-def on_save_state(gui):
+def collect_state(gui):
     # Always save the current dropdown values for stat priorities
     stat_priorities = {}
     if hasattr(gui, 'priority_dropdowns'):
@@ -15,16 +17,64 @@ def on_save_state(gui):
         "profile_index": gui.profile_select.currentIndex(),
         "ideal_stats":   gui.ideal_stats,
         "current_stats": gui.current_stats,
-        "history":       gui.history,
+        "history":       gui.history.to_list(),
         "feedback_stat": gui.feedback_stat,
         "total_rounds":  gui.total_rounds,
         "rounds_done":   gui.rounds_done,
         "turns_left":    gui.turns_left,
         "turn":          gui.turn,
-        "stat_priorities": stat_priorities
+        "stat_priorities": stat_priorities,
+        "last_action":   gui.last_action,
+    }
+    return state
+
+def _run_counters(gui):
+    return {
+        "turn":          gui.turn,
+        "turns_left":    gui.turns_left,
+        "rounds_done":   gui.rounds_done,
+        "total_rounds":  gui.total_rounds,
+        "feedback_stat": gui.feedback_stat,
     }
+
+def start_autosave(gui):
+    """
+    Snapshot a freshly initialized run; autosave() journals it from here on.
+    There is one save slot, so an existing saved run is only replaced if the
+    user agrees; otherwise this run isn't autosaved.
+    """
+    gui.autosaving = False
+    if not AUTOSAVE:
+        return
+    if has_state():
+        reply = QMessageBox.question(
+            gui, "Replace Saved Run?",
+            "Autosaving this run replaces the run saved earlier.\n"
+            "Replace it? (No keeps it and leaves this run unsaved until you press Save.)")
+        if reply != QMessageBox.StandardButton.Yes:
+            gui.log("💾 Autosave off for this run; the saved run is kept.")
+            return
+    try:
+        journal.start(collect_state(gui))
+        gui.autosaving = True
+        gui.load_state_btn.setEnabled(True)
+    except Exception as e:
+        gui.log(f"⚠️ Autosave failed: {e}")
+
+def autosave(gui, op, **fields):
+    """Journal one event of the run (see journal.py); never interrupts play."""
+    if not AUTOSAVE or not getattr(gui, "autosaving", False):
+        return
+    try:
+        journal.append(op, _run_counters(gui), snapshot=lambda: collect_state(gui), **fields)
+    except Exception as e:
+        gui.log(f"⚠️ Autosave failed: {e}")
+
+def on_save_state(gui):
     try:
-        save_state(state)
+        # A full snapshot; the journal up to here is folded into it
+        journal.compact(collect_state(gui))
+        gui.autosaving = True   # This run owns the save slot now
         gui.log("✅ Run state saved.")
         gui.load_state_btn.setEnabled(True)
         QMessageBox.information(gui, "Saved", "Run state saved to disk.")
@@ -59,12 +109,16 @@ def on_load_state(gui):
     gui.current_stats = data["current_stats"]
     # You can choose to prefill detected_inputs or leave blank until next scan
 
-    gui.history       = data["history"]
+    gui.history       = RunHistory(data["history"])
     gui.feedback_stat = data["feedback_stat"]
     gui.total_rounds  = data["total_rounds"]
     gui.rounds_done   = data["rounds_done"]
     gui.turns_left    = data["turns_left"]
     gui.turn          = data["turn"]
+    # Resume learning the gains of an action chosen before the app closed
+    gui.last_action   = data.get("last_action")
+    gui.prev_stats    = dict(gui.current_stats) if gui.last_action else None
+    gui.autosaving    = True   # Journaling continues the loaded run
 
     # Redraw graphs to show loaded history:
     gui.update_graph()
@@ -0,0 +1,99 @@
+import numpy as np
+from PyQt6.QtCore import QThread, pyqtSignal
+from stat_planner.gui.scan_ui import apply_scanned_stats
+from stat_planner.settings import (
+    WATCH_INTERVAL_MS, WATCH_SEARCH_INTERVAL_MS, WATCH_SEARCH_MAX_INTERVAL_MS, WATCH_CHANGE_THRESHOLD
+)
+
+def _changed(a, b):
+    if a is None or b is None or a.shape != b.shape:
+        return True
+    return np.abs(a.astype(np.int16) - b.astype(np.int16)).mean() > WATCH_CHANGE_THRESHOLD
+
+class StatWatcher(QThread):
+    """
+    Polls a thumbnail of the stat panel and only runs the full OCR once the
+    panel has changed and then held still for one poll (so numbers that are
+    still ticking up aren't read mid-animation). While the panel isn't
+    located, full-frame searches back off exponentially, and stop entirely
+    until the game window exists.
+    """
+    stats_read = pyqtSignal(dict)
+
+    def _sleep(self, ms):
+        # Short slices so stop_watch doesn't wait out a long back-off
+        while ms > 0 and not self.isInterruptionRequested():
+            self.msleep(min(ms, 100))
+            ms -= 100
+
+    def run(self):
+        from stat_planner.ocr import auto_read_stats, panel_fingerprint, get_capture_backend
+        last_read = None   # fingerprint of the panel we last read
+        pending = None     # changed fingerprint waiting to settle
+        search_delay = WATCH_SEARCH_INTERVAL_MS
+        while not self.isInterruptionRequested():
+            fp = panel_fingerprint()
+            if fp is None:
+                if get_capture_backend().window_box() is None:
+                    # No game window: a full-screen scan would only read the desktop
+                    search_delay = WATCH_SEARCH_INTERVAL_MS
+                    self._sleep(WATCH_SEARCH_INTERVAL_MS)
+                    continue
+                # Panel not located yet: full-frame scan, less often the longer it stays away
+                stats = auto_read_stats()
+                if stats:
+                    last_read = panel_fingerprint()
+                    self.stats_read.emit(stats)
+                    search_delay = WATCH_SEARCH_INTERVAL_MS
+                    self._sleep(WATCH_INTERVAL_MS)
+                else:
+                    self._sleep(search_delay)
+                    search_delay = min(2 * search_delay, WATCH_SEARCH_MAX_INTERVAL_MS)
+                continue
+            search_delay = WATCH_SEARCH_INTERVAL_MS
+            if _changed(fp, last_read):
+                if pending is not None and not _changed(fp, pending):
+                    stats = auto_read_stats()
+                    if stats:
+                        last_read = fp
+                        self.stats_read.emit(stats)
+                    pending = None
+                else:
+                    pending = fp
+            else:
+                pending = None
+            self._sleep(WATCH_INTERVAL_MS)
+
+def toggle_watch(gui, enabled):
+    if enabled:
+        if gui.turn == 0 and not gui.initialize_run():
+            gui.watch_toggle.setChecked(False)
+            return
+        gui.watcher = StatWatcher(gui)
+        gui.watcher.stats_read.connect(lambda stats: on_watch_stats(gui, stats))
+        gui.watcher.start()
+        gui.log("👀 Watch mode on — stats are read when the panel changes.")
+    else:
+        stop_watch(gui)
+        gui.log("👀 Watch mode off.")
+        from stat_planner.ocr import digit_cache_stats
+        dc = digit_cache_stats()
+        if dc["hits"] + dc["misses"]:
+            gui.log(f"[INFO] Digit cache: {dc['hits']}/{dc['hits'] + dc['misses']} reads reused "
+                    f"(~{dc['saved_ms']:.0f} ms of matching saved)")
+
+def stop_watch(gui):
+    watcher = getattr(gui, "watcher", None)
+    if watcher is not None:
+        watcher.requestInterruption()
+        watcher.wait()
+        gui.watcher = None
+
+def on_watch_stats(gui, stats):
+    # Stats already confirmed for this turn; wait for Train/Recover
+    if gui.train_btn.isEnabled():
+        return
+    if stats == gui.current_stats and gui.confirm_btn.isEnabled():
+        return
+    apply_scanned_stats(gui, stats)
+    gui.log(f"👀 Panel changed: {stats}")
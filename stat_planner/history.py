@@ -0,0 +1,111 @@
+"""
+Run history as one growable array (turns x STATS) instead of a list of dicts.
+
+RunHistory still behaves like the list of {stat: value} dicts it replaces:
+len(), indexing, iteration, append(dict), clear(). Rows come back as
+StatVector, a read-only mapping over the row. The graph and exporter read
+whole columns with column(stat), which is a view and doesn't copy.
+"""
+from collections.abc import Mapping
+import numpy as np
+from .settings import STATS
+
+_INDEX = {s: i for i, s in enumerate(STATS)}
+DTYPE = np.int32   # Stats are capped at MAX_STAT_VALUE, well inside int32
+
+class StatVector(Mapping):
+    """One turn's stats: a read-only {stat: int} view of a history row."""
+    __slots__ = ("_row",)
+
+    def __init__(self, row):
+        self._row = row
+
+    def __getitem__(self, stat):
+        return int(self._row[_INDEX[stat]])
+
+    def __iter__(self):
+        return iter(STATS)
+
+    def __len__(self):
+        return len(STATS)
+
+    def __repr__(self):
+        return f"StatVector({self.to_dict()})"
+
+    def to_dict(self):
+        return dict(zip(STATS, self._row.tolist()))
+
+    copy = to_dict
+
+    @property
+    def array(self):
+        return self._row
+
+class RunHistory:
+    """Per-turn stats of a run, appended once per confirmed turn."""
+    __slots__ = ("_data", "_len")
+
+    def __init__(self, rows=(), capacity=64):
+        size = len(rows) if hasattr(rows, "__len__") else 0
+        self._data = np.zeros((max(1, capacity, size), len(STATS)), dtype=DTYPE)
+        self._len = 0
+        self.extend(rows)
+
+    def append(self, stats):
+        """Add one turn; `stats` is a {stat: value} mapping or an array in STATS order."""
+        if self._len == len(self._data):
+            # Double the buffer so appends stay O(1) on average
+            grown = np.zeros((2 * len(self._data), len(STATS)), dtype=DTYPE)
+            grown[:self._len] = self._data[:self._len]
+            self._data = grown
+        if isinstance(stats, Mapping):
+            stats = [stats[s] for s in STATS]
+        self._data[self._len] = stats
+        self._len += 1
+
+    def extend(self, rows):
+        for stats in rows:
+            self.append(stats)
+
+    def clear(self):
+        # New buffer, so StatVectors already handed out keep their values
+        self._data = np.zeros_like(self._data[:64])
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return RunHistory(self.array[i])
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("history index out of range")
+        return StatVector(self.array[i])
+
+    def __iter__(self):
+        for row in self.array:
+            yield StatVector(row)
+
+    def __repr__(self):
+        return f"RunHistory({self._len} turns)"
+
+    @property
+    def array(self):
+        """Read-only (turns, len(STATS)) view of the history."""
+        view = self._data[:self._len]
+        view.flags.writeable = False
+        return view
+
+    def column(self, stat):
+        """Every turn's value of `stat`, as a view."""
+        return self.array[:, _INDEX[stat]]
+
+    def to_list(self):
+        """List of plain dicts, as saved in run_state.json."""
+        return [dict(zip(STATS, row)) for row in self.array.tolist()]
+
+def as_history(history):
+    """A RunHistory for either a RunHistory or a list of stat dicts."""
+    return history if isinstance(history, RunHistory) else RunHistory(history)
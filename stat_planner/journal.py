@@ -0,0 +1,168 @@
+"""
+Append-only run journal.
+
+Every confirmed turn, action and race result is appended to run_journal.jsonl
+as one small JSON line, next to the run_state snapshot. Lines are fsync'd in
+batches: after JOURNAL_FSYNC_EVERY records, at the end of each turn ("ready"),
+and by the app's timer calling sync() every JOURNAL_FSYNC_INTERVAL_S while
+records are pending. Every JOURNAL_COMPACT_EVERY records the journal is
+folded into a fresh snapshot and truncated. state.load_state() replays the
+journal on top of the snapshot, so a crash loses at most the last unsynced
+batch.
+
+Records are {"seq", "op", "run": {counters after the event}, ...}; ops:
+  turn   - stats confirmed ("stats")
+  action - training or recover chosen ("action")
+  race   - race result ("stage", "won")
+  ready  - turn finished; the point a restored run resumes from
+"""
+import atexit
+import json
+import os
+import time
+from .settings import BASE_PATH, JOURNAL_FSYNC_EVERY, JOURNAL_FSYNC_INTERVAL_S, JOURNAL_COMPACT_EVERY
+
+JOURNAL_FILE = BASE_PATH / "run_journal.jsonl"
+
+_file = None
+_seq = None            # seq of the last record written or replayed
+_snapshot_seq = 0      # last seq folded into the snapshot
+_unsynced = 0
+_last_sync = 0.0
+_good_size = None      # bytes of whole records; a torn tail past this is cut before appending
+
+def _read_records(after=0):
+    """Records with seq > `after`. A torn last line (crash mid-write) ends the replay."""
+    global _good_size
+    records = []
+    _good_size = 0
+    if not JOURNAL_FILE.exists():
+        return records
+    with open(JOURNAL_FILE, "rb") as f:
+        for n, line in enumerate(f, 1):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError
+                record = json.loads(line)
+            except ValueError:
+                print(f"[WARN] Journal line {n} is incomplete; replay stops there.")
+                break
+            _good_size += len(line)
+            if record["seq"] > after:
+                records.append(record)
+    return records
+
+def replay(state):
+    """Apply the journal to a snapshot from state.py; returns the up-to-date state."""
+    global _seq, _snapshot_seq
+    if state is None:
+        return None
+    _snapshot_seq = state.get("journal_seq", 0)
+    _seq = _snapshot_seq
+    for record in _read_records(_snapshot_seq):
+        state.update(record["run"])
+        if record["op"] == "turn":
+            state["history"].append(record["stats"])
+            state["current_stats"] = record["stats"]
+            state["last_action"] = None   # its gains were learned from these stats
+        elif record["op"] == "action":
+            state["last_action"] = record["action"]
+        _seq = record["seq"]
+    state["journal_seq"] = _seq
+    return state
+
+def _ensure_seq():
+    global _seq
+    if _seq is None:
+        from .state import load_state
+        load_state()   # replays, which sets _seq
+        _seq = _seq or 0
+
+def _open():
+    global _file
+    _ensure_seq()
+    _file = open(JOURNAL_FILE, "a")
+    if _good_size is not None and _file.tell() > _good_size:
+        _file.truncate(_good_size)
+
+def sync():
+    """Force pending records to disk."""
+    global _unsynced, _last_sync
+    if _file is None or not _unsynced:
+        return
+    _file.flush()
+    os.fsync(_file.fileno())
+    _unsynced = 0
+    _last_sync = time.monotonic()
+
+def close():
+    global _file
+    if _file is not None:
+        sync()
+        _file.close()
+        _file = None
+
+atexit.register(close)
+
+def sync_due():
+    """fsync pending records if the last fsync is JOURNAL_FSYNC_INTERVAL_S old; for the app's timer."""
+    if _unsynced and time.monotonic() - _last_sync >= JOURNAL_FSYNC_INTERVAL_S:
+        sync()
+
+def append(op, run, snapshot=None, **fields):
+    """
+    Journal one event. `run` holds the run counters as they are after it.
+    `snapshot`, if given, returns the full current state; compaction saves
+    that, so settings changed mid-run (priorities, ideal stats) are kept.
+    """
+    global _seq, _unsynced
+    if _file is None:
+        _open()
+    _seq += 1
+    _file.write(json.dumps({"seq": _seq, "op": op, "run": run, **fields}, separators=(",", ":")) + "\n")
+    _file.flush()   # In the OS cache at once; fsync'd below in batches
+    _unsynced += 1
+    if (op == "ready" or _unsynced >= JOURNAL_FSYNC_EVERY
+            or time.monotonic() - _last_sync >= JOURNAL_FSYNC_INTERVAL_S):
+        sync()
+    if _seq - _snapshot_seq >= JOURNAL_COMPACT_EVERY:
+        compact(snapshot() if snapshot else None)
+
+def compact(state=None):
+    """
+    Write `state` (or the snapshot + journal so far) as the new snapshot and
+    empty the journal. The snapshot records the last seq it contains, so a
+    crash between the two steps can't replay a record twice.
+    """
+    global _snapshot_seq, _good_size
+    from .state import load_state, save_state
+    _ensure_seq()
+    if state is None:
+        state = load_state()
+        if state is None:
+            return
+    close()
+    save_state(dict(state, journal_seq=_seq))
+    _snapshot_seq = _seq
+    JOURNAL_FILE.unlink(missing_ok=True)
+    _good_size = None
+
+def start(state):
+    """
+    Begin journaling a new run: empty the journal, then snapshot its starting
+    state. This replaces any saved run; callers check state.has_state() first.
+    """
+    global _seq, _snapshot_seq, _good_size
+    from .state import save_state
+    close()
+    JOURNAL_FILE.unlink(missing_ok=True)
+    _seq = _snapshot_seq = 0
+    _good_size = None
+    save_state(dict(state, journal_seq=0))
+
+def discard():
+    """Drop the journal (the run is over)."""
+    global _seq, _snapshot_seq
+    close()
+    JOURNAL_FILE.unlink(missing_ok=True)
+    _seq, _snapshot_seq = None, 0
@@ -0,0 +1,113 @@
+import time
+import numpy as np
+from .settings import (
+    STATS, MAX_STAT_VALUE, LOOKAHEAD_DEPTH, LOOKAHEAD_TIME_BUDGET_MS, LOOKAHEAD_MAX_NODES,
+    LOOKAHEAD_MIN_SAMPLES, LOOKAHEAD_DEFAULT_GAIN, LOOKAHEAD_GAIN_SPREAD
+)
+from .planner import _score_arrays
+from .profiles import gain_stats
+
+ACTIONS = STATS + ["recover"]
+# States are packed into one int64 (11 bits per stat) so merging them is a 1-D unique
+_KEY_BITS = int(MAX_STAT_VALUE).bit_length()
+_KEY_SHIFTS = np.arange(len(STATS), dtype=np.int64) * _KEY_BITS
+# Each action's gain is a three-point spread around its learned mean
+OUTCOME_PROBS = np.array([0.25, 0.5, 0.25])
+_OUTCOME_OFFSETS = np.array([-1.0, 0.0, 1.0])
+
+def action_outcomes(action_stats=None):
+    """
+    Per-action gain outcomes from a profile's analytics["action_stats"].
+    Returns an (actions, outcomes, stats) gain array for ACTIONS.
+    Actions with fewer than LOOKAHEAD_MIN_SAMPLES recorded turns fall back
+    to LOOKAHEAD_DEFAULT_GAIN on the trained stat (nothing for recover).
+    The outcomes are mean -/+ a step that matches the learned variance, or
+    mean x LOOKAHEAD_GAIN_SPREAD while the spread isn't known yet.
+    """
+    action_stats = action_stats or {}
+    mean = np.zeros((len(ACTIONS), len(STATS)))
+    step = np.zeros((len(ACTIONS), len(STATS)))
+    for a, action in enumerate(ACTIONS):
+        record = action_stats.get(action)
+        if record and record.get("count", 0) >= LOOKAHEAD_MIN_SAMPLES:
+            for i, s in enumerate(STATS):
+                g = gain_stats(record, s)
+                mean[a, i] = g["mean"]
+                # The (.25, .5, .25) spread of +-step has variance step^2 / 2
+                step[a, i] = g["std"] * np.sqrt(2.0) if g["n"] >= LOOKAHEAD_MIN_SAMPLES else g["mean"] * LOOKAHEAD_GAIN_SPREAD
+        elif action in STATS:
+            mean[a, STATS.index(action)] = LOOKAHEAD_DEFAULT_GAIN
+            step[a, STATS.index(action)] = LOOKAHEAD_DEFAULT_GAIN * LOOKAHEAD_GAIN_SPREAD
+    outcomes = mean[:, None, :] + step[:, None, :] * _OUTCOME_OFFSETS[None, :, None]
+    return np.clip(outcomes, 0.0, None)
+
+def step_rewards(states, expanded, ideal, **weights):
+    """
+    Reward of each (state, action, outcome) step: the stat points gained,
+    each weighted by its stat's weighted gap in the state it was trained
+    from. That is the greedy priority, so with the same gain on every stat
+    a one-turn search picks what suggest_training does.
+    """
+    weighted = _score_arrays(states, ideal, **weights)["weighted_gaps"]
+    return ((expanded - states[:, None, None, :]) * weighted[:, None, None, :]).sum(axis=-1)
+
+def lookahead(current, ideal, turns, action_stats=None, depth=None, time_budget_ms=None, **weights):
+    """
+    Expectimax over the next `turns` turns (capped at `depth`), deepening one
+    turn at a time until the depth, node or time budget runs out. A line's
+    value is the sum of its step_rewards.
+
+    States reached by different action orders are merged (rounded to whole
+    stat points), so each search level is a table of unique states and the
+    expected values are backed up through it with array ops. `weights` are
+    passed to planner._score_arrays (priority_weights, feedback, ...).
+
+    Returns {"action", "values": {action: expected value}, "depth", "nodes", "ms"},
+    or None if `turns` < 1.
+    """
+    t0 = time.perf_counter()
+    depth = min(turns, depth or LOOKAHEAD_DEPTH)
+    if depth < 1:
+        return None
+    budget = (time_budget_ms or LOOKAHEAD_TIME_BUDGET_MS) / 1000.0
+    gains = action_outcomes(action_stats)
+    ideal = np.asarray(ideal, dtype=np.float64)
+
+    levels = [np.asarray(current, dtype=np.float64)[None, :]]
+    children = []   # children[k][i, a, o] = index into levels[k+1]
+    rewards = []    # rewards[k][i, a, o] = step_rewards of that move
+    result = None
+    nodes = 1
+    level_s = 0.0   # time the last level took, to predict the next one
+    while len(children) < depth:
+        parents = levels[-1]
+        growth = len(parents) / len(levels[-2]) if len(levels) > 1 else len(ACTIONS) * len(OUTCOME_PROBS)
+        if result is not None and time.perf_counter() - t0 + level_s * growth > budget:
+            break
+        t_level = time.perf_counter()
+        expanded = np.clip(np.rint(parents[:, None, None, :] + gains[None]), 0, MAX_STAT_VALUE).astype(np.int64)
+        keys = (expanded << _KEY_SHIFTS).sum(axis=-1)
+        unique_keys, inverse = np.unique(keys.ravel(), return_inverse=True)
+        if nodes + len(unique_keys) > LOOKAHEAD_MAX_NODES:
+            break
+        nodes += len(unique_keys)
+        unique = ((unique_keys[:, None] >> _KEY_SHIFTS) & ((1 << _KEY_BITS) - 1)).astype(np.float64)
+        levels.append(unique)
+        children.append(inverse.reshape(keys.shape))
+        rewards.append(step_rewards(parents, expanded, ideal, **weights))
+
+        # Back up expected values from the new leaves to the root
+        values = np.zeros(len(unique))
+        for k in range(len(children) - 1, -1, -1):
+            q = ((rewards[k] + values[children[k]]) * OUTCOME_PROBS).sum(axis=-1)
+            values = q.max(axis=1)
+        result = {
+            "action": ACTIONS[int(q[0].argmax())],
+            "values": {a: float(v) for a, v in zip(ACTIONS, q[0])},
+            "depth": len(children),
+        }
+        level_s = time.perf_counter() - t_level
+    if result is not None:
+        result["nodes"] = nodes
+        result["ms"] = (time.perf_counter() - t0) * 1000
+    return result
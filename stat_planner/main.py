@@ -1,11 +1,51 @@
 import sys
+import time
+_T0 = time.perf_counter()
+
 from PyQt6.QtWidgets import QApplication
-from .main_gui import StatPlannerGUI
+from PyQt6.QtCore import QTimer
+from .settings import OCR_WARMUP, OCR_WARMUP_DELAY_MS, STARTUP_BUDGET_MS
+
+# Modules that should stay unloaded until first use
+DEFERRED_MODULES = ["cv2", "stat_planner.ocr", "stat_planner.exporter", "pptx", "matplotlib"]
+
+def start_ocr_warmup():
+    """Import the OCR engine and decode templates off the UI thread."""
+    import threading
+    def run():
+        from . import ocr
+        ocr.warm_up()
+    threading.Thread(target=run, name="ocr-warmup", daemon=True).start()
+
+def print_startup_report(marks):
+    print("Startup report (ms since launch):")
+    for name, t in marks.items():
+        print(f"  {name:14} {t * 1000:8.1f}")
+    loaded = [m for m in DEFERRED_MODULES if m in sys.modules]
+    print(f"  Deferred modules loaded early: {', '.join(loaded) or 'none'}")
+    total = marks["first paint"] * 1000
+    ok = total <= STARTUP_BUDGET_MS
+    print(f"  {'OK' if ok else 'OVER BUDGET'}: {total:.0f} ms (budget {STARTUP_BUDGET_MS} ms)")
+    return ok
 
 def main():
+    report = "--startup-report" in sys.argv
+    marks = {"qt import": time.perf_counter() - _T0}
     app = QApplication(sys.argv)
+    from .main_gui import StatPlannerGUI
+    marks["gui import"] = time.perf_counter() - _T0
     window = StatPlannerGUI()
+    marks["window built"] = time.perf_counter() - _T0
     window.show()
+
+    def on_first_paint():
+        marks["first paint"] = time.perf_counter() - _T0
+        if report:
+            ok = print_startup_report(marks)
+            app.exit(0 if ok else 1)
+        elif OCR_WARMUP:
+            QTimer.singleShot(OCR_WARMUP_DELAY_MS, start_ocr_warmup)
+    QTimer.singleShot(0, on_first_paint)
     sys.exit(app.exec())
 
 if __name__ == "__main__":
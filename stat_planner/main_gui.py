@@ -7,22 +7,22 @@ from PyQt6.QtWidgets import (
     QComboBox, QFileDialog, QDialog, QFormLayout, QDialogButtonBox, QSplitter
 )
 from PyQt6.QtGui import QPixmap, QIcon, QIntValidator
-from PyQt6.QtCore import Qt
-import pyqtgraph as pg
+from PyQt6.QtCore import Qt, QTimer
 from stat_planner.gui.graph_ui import setup_graphs, update_graph
-from stat_planner.gui.state_ui import on_save_state, on_load_state
+from stat_planner.gui.state_ui import on_save_state, on_load_state, start_autosave, autosave
 from stat_planner.gui.scan_ui import scan_stats, confirm_stats
+from stat_planner.gui.watch_ui import toggle_watch, stop_watch
 from stat_planner.gui.actions_ui import train_action, recover_action, race_action
 from stat_planner.gui.profile_ui import on_profile_selected, show_add_profile_dialog, show_edit_profile_dialog
 import json
-from .exporter import export_run_summary
-from .state import STATE_FILE
+from .state import has_state, clear_state
 
-from .settings   import STATS, ICON_PATH, PHOTOS_DIR, PRIORITY_WEIGHTS
+from .settings   import STATS, ICON_PATH, PHOTOS_DIR, PRIORITY_WEIGHTS, LOOKAHEAD_ENABLED, JOURNAL_FSYNC_INTERVAL_S
 from .assets     import load_stat_icons
-from .ocr        import auto_read_stats
 from .planner    import suggest_training, race_stage
-from .profiles   import load_profiles
+from .profiles   import get_profiles, flush_profiles
+from .history    import RunHistory
+from . import journal
 
 class StatPlannerGUI(QWidget):
     def __init__(self):
@@ -40,17 +40,24 @@ class StatPlannerGUI(QWidget):
             # --- State ---
             self.ideal_stats = {}
             self.current_stats = {}
-            self.history = []
+            self.history = RunHistory()
             self.feedback_stat = None
             self.total_rounds = self.rounds_done = 0
             self.turns_left = self.turn = 0
             self.last_action = None
             self.prev_stats  = None
+            self.scan_failed = []   # stats a partial scan couldn't read this turn
+            self.autosaving  = False   # journaling this run (see state_ui.start_autosave)
+
+            # fsync journal records left pending while the user is idle
+            self.journal_timer = QTimer(self)
+            self.journal_timer.timeout.connect(journal.sync_due)
+            self.journal_timer.start(int(JOURNAL_FSYNC_INTERVAL_S * 1000))
 
             self.stat_priorities = {s: 'Normal' for s in STATS}
             self.priority_dropdowns = {}
             self.stat_icons = load_stat_icons()
-            self.profiles = load_profiles()
+            self.profiles = get_profiles()
 
             # --- Main content layout ---
             self.main_content = QWidget()
@@ -194,6 +201,10 @@ class StatPlannerGUI(QWidget):
             self.confirm_btn.setEnabled(False)
             btns.addWidget(self.scan_btn)
             btns.addWidget(self.confirm_btn)
+            self.watch_toggle = QCheckBox("Watch Mode")
+            self.watch_toggle.setToolTip("Read stats automatically whenever the in-game stat panel changes")
+            self.watch_toggle.toggled.connect(lambda on: toggle_watch(self, on))
+            btns.addWidget(self.watch_toggle)
             main_layout.addLayout(btns)
 
             # --- Train/Recover ---
@@ -210,6 +221,10 @@ class StatPlannerGUI(QWidget):
             ar.addWidget(self.train_btn)
             ar.addWidget(self.recover_btn)
             ar.addWidget(self.race_btn)
+            self.lookahead_toggle = QCheckBox("Lookahead")
+            self.lookahead_toggle.setToolTip("Plan over the remaining turns before the next race using learned gains")
+            self.lookahead_toggle.setChecked(LOOKAHEAD_ENABLED)
+            ar.addWidget(self.lookahead_toggle)
             main_layout.addLayout(ar)
 
             # --- Graphs ---
@@ -231,7 +246,7 @@ class StatPlannerGUI(QWidget):
             sv.addWidget(self.save_state_btn)
             self.load_state_btn = QPushButton("Load Run State")
             self.load_state_btn.clicked.connect(lambda: on_load_state(self))
-            self.load_state_btn.setEnabled(STATE_FILE.exists())
+            self.load_state_btn.setEnabled(has_state())
             sv.addWidget(self.load_state_btn)
             main_layout.addLayout(sv)
 
@@ -268,7 +283,7 @@ class StatPlannerGUI(QWidget):
             print("[ERROR] Exception in StatPlannerGUI.__init__:")
             traceback.print_exc()
             self.load_state_btn.clicked.connect(lambda: on_load_state(self))
-            self.load_state_btn.setEnabled(STATE_FILE.exists())
+            self.load_state_btn.setEnabled(has_state())
             sv.addWidget(self.load_state_btn)
             main_layout.addLayout(sv)
             print("[DEBUG] Save/export buttons added")
@@ -308,6 +323,12 @@ class StatPlannerGUI(QWidget):
             traceback.print_exc()
 
 
+    def closeEvent(self, event):
+        stop_watch(self)
+        flush_profiles()
+        journal.close()
+        super().closeEvent(event)
+
     def popout_log_window(self):
         dlg = QDialog(self)
         dlg.setWindowTitle("Log Output")
@@ -351,6 +372,7 @@ class StatPlannerGUI(QWidget):
             self.turns_total_input.setReadOnly(True)
             self.log("✅ Run initialized.")
             self.update_rounds_turns_fields()
+            start_autosave(self)
             return True
         except Exception as e:
             QMessageBox.warning(self, "Input Error", "Enter valid integers.")
@@ -367,9 +389,11 @@ class StatPlannerGUI(QWidget):
             self.feedback_stat,
             priorities=self.stat_priorities,
             profile_index=self.profile_select.currentIndex() - 1 if self.profile_select.currentIndex() > 0 else None,
-            loss_reason_weight=loss_reason_weight
+            loss_reason_weight=loss_reason_weight,
+            lookahead=self.lookahead_toggle.isChecked()
         )
         self.last_action = choice
+        autosave(self, "action", action=choice)
 
         # Start log message
         self.log(f"📌 Train {choice.capitalize()} — {reason}")
@@ -386,6 +410,8 @@ class StatPlannerGUI(QWidget):
 
     def recover_action(self):
         self.log("💤 Recovery turn")
+        self.last_action = "recover"   # its gains feed the lookahead's Recover model
+        autosave(self, "action", action="recover")
         self.advance_turn()
 
     def advance_turn(self):
@@ -405,13 +431,14 @@ class StatPlannerGUI(QWidget):
             self.feedback_stat = fb.lower() if ok and fb.lower() in STATS else None
             self.rounds_done += 1
             self.update_rounds_turns_fields()
+            autosave(self, "race", stage=stage, won=True)
             next_stage = race_stage(self.rounds_done, self.total_rounds)
             if next_stage == "End":
                 QMessageBox.information(self, "Done", "🏆 Final complete!")
                 # Remove the saved state file if it exists
-                if STATE_FILE.exists():
+                if has_state():
                     try:
-                        STATE_FILE.unlink()
+                        clear_state()
                         self.load_state_btn.setEnabled(False)
                         self.log("🗑️ Cleared saved run state.")
                     except Exception as e:
@@ -427,20 +454,14 @@ class StatPlannerGUI(QWidget):
             if ok2 and stat.lower() in STATS:
                 idx = self.profile_select.currentIndex()-1 if self.profile_select.currentIndex()>0 else None
                 if idx is not None:
-                    import json
-                    from stat_planner.profiles import load_profiles, save_profiles
-                    profiles = load_profiles()
-                    profile = profiles[idx]
-                    analytics = profile.setdefault("analytics", {})
-                    loss_reasons = analytics.setdefault("loss_reasons", {})
-                    loss_reasons[stat.lower()] = loss_reasons.get(stat.lower(), 0) + 1
-                    save_profiles(profiles)
-                    self.log(f"📈 Recorded loss reason: {stat.capitalize()} for {profile['name']}")
+                    from stat_planner.profiles import get_profile, record_loss_reason
+                    record_loss_reason(idx, stat.lower())
+                    self.log(f"📈 Recorded loss reason: {stat.capitalize()} for {get_profile(idx)['name']}")
             QMessageBox.information(self, "Run Over", "❌ Run ended.")
             # Remove the saved state file if it exists
-            if STATE_FILE.exists():
+            if has_state():
                 try:
-                    STATE_FILE.unlink()
+                    clear_state()
                     self.load_state_btn.setEnabled(False)
                     self.log("🗑️ Cleared saved run state.")
                 except Exception as e:
@@ -451,6 +472,9 @@ class StatPlannerGUI(QWidget):
         self.train_btn.setEnabled(False); self.recover_btn.setEnabled(False); self.race_btn.setEnabled(False); self.confirm_btn.setEnabled(False)
         for s in STATS:
             self.detected_inputs[s].clear(); self.detected_inputs[s].setEnabled(False)
+        self.scan_failed = []
+        flush_profiles()
+        autosave(self, "ready")
         self.update_rounds_turns_fields()
         # combined message:
         self.log(f"🔄 Ready for turn {self.turn}  •  {self.turns_left} turns left until next race")
@@ -493,7 +517,7 @@ class StatPlannerGUI(QWidget):
             with open("stat_history.csv","w",newline="") as f:
                 w=csv.DictWriter(f,fieldnames=["Turn"]+STATS)
                 w.writeheader()
-                for i,r in enumerate(self.history,1):
+                for i,r in enumerate(self.history.to_list(),1):
                     w.writerow({"Turn":i,**r})
             self.log("✅ CSV saved.")
         except Exception as e:
@@ -505,5 +529,7 @@ class StatPlannerGUI(QWidget):
         idx = self.profile_select.currentIndex()
         if idx > 0:
             photo = str(Path(PHOTOS_DIR) / self.profiles[idx-1]["photo"]) if self.profiles[idx-1].get("photo") else None
+        # python-pptx and matplotlib are slow to import; only load them on export
+        from .exporter import export_run_summary
         export_run_summary(self.history, self.ideal_stats, trainee, photo)
         QMessageBox.information(self, "Export Complete", "run_summary.pptx created!")
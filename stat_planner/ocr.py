@@ -1,70 +1,672 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
-from .utils.screenshot import grab_game_screen  # adjust path as needed
-from .settings import STATS, MATCH_THRESHOLD, DIGIT_MATCH_THRESHOLD
-from .assets import load_templates, load_digit_templates
+from numpy.lib.stride_tricks import sliding_window_view
+from .utils.capture import LiveCapture, ArrayCapture, IMAGE_EXTS
+from .settings import (
+    STATS, MATCH_THRESHOLD, DIGIT_MATCH_THRESHOLD, DIGIT_MIN_SPACING, MAX_STAT_VALUE,
+    LAYOUT_ROI_PADDING, LAYOUT_SEARCH_PADDING, WATCH_FINGERPRINT_SIZE, SCALE_MISS_RETRY_S,
+    TEMPLATE_BASE_HEIGHT, SCALE_PROBE_LEVELS, OCR_WORKERS, DIGIT_RECOGNIZER, DIGIT_CACHE_SIZE,
+    PLAUSIBLE_MAX_DROP, PLAUSIBLE_MAX_GAIN, PLAUSIBLE_GAIN_FACTOR, PLAUSIBLE_GAIN_SLACK, PLAUSIBLE_MIN_SAMPLES,
+    PLAUSIBLE_GAIN_SIGMAS
+)
+from .assets import load_templates, load_digit_templates, load_template_pyramid, load_glyph_table
+from .glyphs import classify_digits
 
-# Initialize once
-stat_templates  = load_templates()
-digit_templates = load_digit_templates()
+# Decoded on first use (or by warm_up) rather than at import
+stat_templates  = None
+digit_templates = None
+stat_pyramid    = None
+digit_pyramid   = None
+glyph_table     = None
+_templates_lock = threading.Lock()
 
-def match_digits(region, debug=False, stat_name=""):
-    found = []
-    for digit, tmpl in digit_templates.items():
-        res = cv2.matchTemplate(region, tmpl, cv2.TM_CCOEFF_NORMED)
-        loc = np.where(res >= DIGIT_MATCH_THRESHOLD)
-        for pt in zip(*loc[::-1]):
-            found.append((pt[0], res[pt[1], pt[0]], digit))
-    if not found:
+def warm_up():
+    """Decode templates and build the pyramids. Safe to call from any thread."""
+    global stat_templates, digit_templates, stat_pyramid, digit_pyramid, glyph_table
+    if digit_pyramid is not None:
+        return
+    with _templates_lock:
+        if digit_pyramid is not None:
+            return
+        stat_templates  = load_templates()
+        digit_templates = load_digit_templates()
+        stat_pyramid    = load_template_pyramid("stat", stat_templates)
+        glyph_table     = load_glyph_table(digit_templates)
+        # Assigned last: a non-None digit_pyramid means everything is ready
+        digit_pyramid   = load_template_pyramid("digit", digit_templates)
+
+def _digit_responses(region, templates):
+    """
+    Stack the TM_CCOEFF_NORMED response of every digit template into one
+    (10, H, W) array. Templates are different sizes, so shorter maps are
+    padded with -1 (the lowest possible score).
+    """
+    rh, rw = region.shape[:2]
+    shapes = [t.shape for t in templates.values()]
+    h = rh - min(s[0] for s in shapes) + 1
+    w = rw - min(s[1] for s in shapes) + 1
+    if h <= 0 or w <= 0:
         return None
-    # dedupe & pick highest scores
-    found.sort(key=lambda x: (-x[1], x[0]))
-    result, occupied = [], []
-    for x, score, d in found:
-        if not any(abs(x - ox) < 10 for ox in occupied):
-            result.append((x, d))
-            occupied.append(x)
-    result.sort(key=lambda x: x[0])
-    number = "".join(d for _, d in result)
-    return int(number) if number.isdigit() and int(number) <= 1200 else None
+    stack = np.full((len(templates), h, w), -1.0, dtype=np.float32)
+    for i, tmpl in enumerate(templates.values()):
+        th, tw = tmpl.shape
+        if th > rh or tw > rw:
+            continue
+        res = cv2.matchTemplate(region, tmpl, cv2.TM_CCOEFF_NORMED)
+        stack[i, :res.shape[0], :res.shape[1]] = res
+    return np.nan_to_num(stack, nan=-1.0)
 
-def auto_read_stats(debug=False):
-    screen = grab_game_screen()
-    img = cv2.cvtColor(np.array(screen), cv2.COLOR_RGB2BGR)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.equalizeHist(gray)
+def _suppress(scores, spacing):
+    """
+    Greedy non-maximum suppression over columns, vectorized per round.
+    A column is kept when it outranks every other live column within
+    `spacing` pixels; kept columns then knock out their neighbours. This
+    keeps exactly the columns a sequential highest-score-first pass would.
+    """
+    n = scores.shape[0]
+    cand = scores >= DIGIT_MATCH_THRESHOLD
+    # Rank by (-score, x) so ties resolve left-to-right like the old sort
+    order = np.lexsort((np.arange(n), -scores))
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+    big = np.iinfo(np.int64).max
+    win = 2 * spacing - 1
+    alive, kept = cand.copy(), np.zeros(n, dtype=bool)
+    while alive.any():
+        live_rank = np.where(alive, rank, big)
+        padded = np.pad(live_rank, spacing - 1, constant_values=big)
+        local_min = sliding_window_view(padded, win).min(axis=1)
+        winners = alive & (live_rank == local_min)
+        kept |= winners
+        reach = np.pad(winners, spacing - 1)
+        alive &= ~sliding_window_view(reach, win).any(axis=1)
+    return np.flatnonzero(kept)
 
-    detected = {}
-    last_x = -1
+def match_digits_scored(region, debug=False, stat_name="", scale=1.0):
+    """
+    Read the number in `region`. Returns (value, scores) where scores holds
+    the match score of each digit left-to-right, or (None, []) on failure.
+    """
+    warm_up()
+    templates = digit_pyramid.get(scale, digit_templates)
+    stack = _digit_responses(region, templates)
+    if stack is None:
+        return None, []
+    cols = stack.max(axis=1)                 # best score per digit per column
+    best_digit = cols.argmax(axis=0)
+    best_score = cols.max(axis=0)
+    xs = _suppress(best_score, max(1, round(DIGIT_MIN_SPACING * scale)))
+    if xs.size == 0:
+        return None, []
+    keys = list(templates.keys())
+    number = "".join(keys[d] for d in best_digit[xs])
+    scores = [float(s) for s in best_score[xs]]
+    if debug:
+        print(f"[DEBUG] {stat_name or 'region'} digits: {number} scores: {[round(s, 3) for s in scores]}")
+    if not number.isdigit() or int(number) > MAX_STAT_VALUE:
+        return None, scores
+    return int(number), scores
+
+DIGIT_RECOGNIZERS = ("template", "components")
+
+def set_digit_recognizer(name):
+    """Switch between the template sweep and the connected-component classifier."""
+    global DIGIT_RECOGNIZER
+    if name not in DIGIT_RECOGNIZERS:
+        raise ValueError(f"Unknown digit recognizer: {name}")
+    DIGIT_RECOGNIZER = name
+
+# Digit cache: hash of a cropped number region -> (value, scores). Between
+# turns most of the five numbers are pixel-identical to the last read, so
+# they skip recognition entirely. Keyed on the captured pixels before
+# equalization: the frame's histogram shifts whenever any number changes. Bounded LRU, shared by the digit threads.
+_digit_cache = OrderedDict()
+_digit_cache_lock = threading.Lock()
+_digit_cache_size = DIGIT_CACHE_SIZE
+_digit_cache_stats = {"hits": 0, "misses": 0, "miss_ms": 0.0}
+
+def _region_key(region, scale, recognizer):
+    digest = hashlib.blake2b(np.ascontiguousarray(region).data, digest_size=16).digest()
+    return digest, region.shape, scale, recognizer
+
+def set_digit_cache_size(size):
+    """Resize the digit cache; 0 disables it."""
+    global _digit_cache_size
+    with _digit_cache_lock:
+        _digit_cache_size = max(0, int(size))
+        while len(_digit_cache) > _digit_cache_size:
+            _digit_cache.popitem(last=False)
+
+def clear_digit_cache():
+    with _digit_cache_lock:
+        _digit_cache.clear()
+        _digit_cache_stats.update(hits=0, misses=0, miss_ms=0.0)
+
+def digit_cache_stats():
+    """Hit/miss counts and an estimate of the recognition time the hits saved."""
+    with _digit_cache_lock:
+        stats = dict(_digit_cache_stats, size=len(_digit_cache))
+    misses = stats["misses"]
+    stats["saved_ms"] = stats["hits"] * stats["miss_ms"] / misses if misses else 0.0
+    return stats
+
+def read_digits_scored(region, debug=False, stat_name="", scale=1.0, recognizer=None, raw=None):
+    """
+    (value, scores) from whichever recognizer is selected, cached by region
+    content: that of `raw` (the same crop before equalization) when given.
+    """
+    recognizer = recognizer or DIGIT_RECOGNIZER
+    key = None
+    if _digit_cache_size:
+        key = _region_key(region if raw is None else raw, scale, recognizer)
+        with _digit_cache_lock:
+            hit = _digit_cache.get(key)
+            if hit is not None:
+                _digit_cache.move_to_end(key)
+                _digit_cache_stats["hits"] += 1
+        if hit is not None:
+            if debug:
+                print(f"[DEBUG] {stat_name or 'region'} digits: unchanged, cached {hit[0]}")
+            return hit
+
+    t0 = time.perf_counter()
+    if recognizer == "components":
+        warm_up()
+        result = classify_digits(region, glyph_table, scale=scale, debug=debug, stat_name=stat_name)
+    else:
+        result = match_digits_scored(region, debug=debug, stat_name=stat_name, scale=scale)
+    if key is not None:
+        with _digit_cache_lock:
+            _digit_cache_stats["misses"] += 1
+            _digit_cache_stats["miss_ms"] += (time.perf_counter() - t0) * 1000
+            _digit_cache[key] = result
+            if len(_digit_cache) > _digit_cache_size:
+                _digit_cache.popitem(last=False)
+    return result
 
+def match_digits(region, debug=False, stat_name="", scale=1.0, recognizer=None):
+    return read_digits_scored(region, debug=debug, stat_name=stat_name,
+                              scale=scale, recognizer=recognizer)[0]
+
+# Layout cache: capture size (w, h) -> last good header positions and digit
+# boxes, in capture coordinates, plus the equalization table of the frame
+# they were found in. Only used when the game window is found,
+# since that's what gives us the capture size before grabbing.
+_layout_cache = {}
+# Pyramid level chosen for each capture size
+_scale_cache = {}
+# Capture sizes where no level matched (menus, loading screens): size -> (retry_at, fallback level)
+_scale_misses = {}
+
+# One scan at a time: the watch thread and the Scan button both read and
+# update the caches above (re-entrant, since a re-read scans from inside a scan)
+_ocr_lock = threading.RLock()
+
+def clear_layout_cache():
+    with _ocr_lock:
+        _layout_cache.clear()
+        _scale_cache.clear()
+        _scale_misses.clear()
+
+# Where frames come from; see utils.capture for the available backends
+_capture = LiveCapture()
+
+def set_capture_backend(backend):
+    """Swap the frame source (e.g. ArrayCapture or DirectoryCapture for replay)."""
+    global _capture
+    with _ocr_lock:
+        _capture = backend
+        clear_layout_cache()
+
+def get_capture_backend():
+    return _capture
+
+def _equalize_lut(frame):
+    """The lookup table cv2.equalizeHist applies to `frame`."""
+    hist = cv2.calcHist([frame], [0], None, [256], [0, 256]).ravel().astype(np.int64)
+    first = int(np.flatnonzero(hist)[0])
+    if hist[first] == frame.size:
+        return np.full(256, first, dtype=np.uint8)
+    cdf = np.cumsum(hist) - hist[first]
+    lut = np.clip(np.rint(cdf * (255.0 / (frame.size - hist[first]))), 0, 255).astype(np.uint8)
+    lut[:first] = 0
+    return lut
+
+def _prepare(frame, debug=False, lut=None):
+    """
+    Equalize `frame` with `lut`, or with its own histogram when None.
+    Anchored reads pass the table of the full frame the layout was found in,
+    so a panel crop gets the same contrast as the full-frame read.
+    Returns (img, gray, lut).
+    """
+    if lut is None:
+        lut = _equalize_lut(frame)
+    gray = cv2.LUT(frame, lut)
+    # Only build a colour copy when there are debug boxes to draw on it
+    img = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR) if debug else None
+    return img, gray, lut
+
+def _best_match(search, tmpl):
+    if search.shape[0] < tmpl.shape[0] or search.shape[1] < tmpl.shape[1]:
+        return -1.0, (0, 0)
+    res = cv2.matchTemplate(search, tmpl, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(res)
+    return max_val, max_loc
+
+def _pick_scale(gray):
+    """
+    Choose the pyramid level for this capture size. Levels nearest the
+    size-based guess are probed with the first header; the rest only if
+    none of those clear MATCH_THRESHOLD. The choice is cached per size; a
+    size where nothing matched isn't probed again for SCALE_MISS_RETRY_S.
+    """
+    size = (gray.shape[1], gray.shape[0])
+    if size in _scale_cache:
+        return _scale_cache[size]
+    miss = _scale_misses.get(size)
+    if miss and time.monotonic() < miss[0]:
+        return miss[1]
+    guess = gray.shape[0] / TEMPLATE_BASE_HEIGHT
+    levels = sorted(stat_pyramid, key=lambda s: abs(s - guess))
+    best, best_val = levels[0], -1.0
+    for i, scale in enumerate(levels):
+        if i == SCALE_PROBE_LEVELS and best_val >= MATCH_THRESHOLD:
+            break
+        val, _ = _best_match(gray, stat_pyramid[scale][STATS[0]])
+        if val > best_val:
+            best, best_val = scale, val
+    if best_val >= MATCH_THRESHOLD:
+        _scale_cache[size] = best
+        _scale_misses.pop(size, None)
+        if best != 1.0:
+            print(f"[INFO] Using {best:.1f}x templates for {size[0]}x{size[1]} capture.")
+    else:
+        _scale_misses[size] = (time.monotonic() + SCALE_MISS_RETRY_S, best)
+    return best
+
+def _digit_box(x, y, w, h):
+    # Number region sits just right/below the header
+    y1 = y + h + int(0.1*h)
+    y2 = y1 + int(1.5*h)
+    x1 = x + int(0.45*w)
+    x2 = x + w - int(0.05*w)
+    y2 = y2 - int(0.3*(y2-y1))
+    return x1, y1, x2, y2
+
+def _find_headers(gray, scale):
+    """
+    Full-frame header search, left to right. Returns ({stat: (x, y)}, failed);
+    a header that isn't found doesn't stop the search for the rest.
+    """
+    templates = stat_pyramid[scale]
+    headers, failed = {}, []
+    last_x = -1
     for stat in STATS:
-        tmpl = stat_templates[stat]
-        h, w = tmpl.shape
         search = gray if last_x < 0 else gray[:, last_x+1:]
-        res = cv2.matchTemplate(search, tmpl, cv2.TM_CCOEFF_NORMED)
-        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        max_val, max_loc = _best_match(search, templates[stat])
         if max_val < MATCH_THRESHOLD:
-            return None
+            failed.append(stat)
+            continue
         x = max_loc[0] + (last_x+1 if last_x>=0 else 0)
         y = max_loc[1]
         last_x = x
+        headers[stat] = (x, y)
+    return headers, failed
 
-        # Define number region just right/below the header
-        y1 = y + h + int(0.1*h)
-        y2 = y1 + int(1.5*h)
-        x1 = x + int(0.45*w)
-        x2 = x + w - int(0.05*w)
-        y2 = y2 - int(0.3*(y2-y1))
-        region = gray[y1:y2, x1:x2]
+def _find_headers_anchored(gray, anchors, pad, scale):
+    """Search each header only in a padded window around its last position."""
+    templates = stat_pyramid[scale]
+    headers, failed = {}, []
+    gh, gw = gray.shape
+    for stat, (ax, ay) in anchors.items():
+        h, w = templates[stat].shape
+        sx1, sy1 = max(0, ax - pad), max(0, ay - pad)
+        sx2, sy2 = min(gw, ax + w + pad), min(gh, ay + h + pad)
+        max_val, max_loc = _best_match(gray[sy1:sy2, sx1:sx2], templates[stat])
+        if max_val < MATCH_THRESHOLD:
+            failed.append(stat)
+            continue
+        headers[stat] = (sx1 + max_loc[0], sy1 + max_loc[1])
+    return headers, failed
 
+# Reusable pool for the per-stat digit phase; matchTemplate releases the GIL
+_digit_pool = None
+
+def _digit_workers():
+    return OCR_WORKERS or min(len(STATS), os.cpu_count() or 1)
+
+def _get_digit_pool():
+    global _digit_pool
+    if _digit_pool is None:
+        _digit_pool = ThreadPoolExecutor(max_workers=_digit_workers(), thread_name_prefix="ocr-digits")
+    return _digit_pool
+
+def set_ocr_workers(workers):
+    """Resize the digit pool. None sizes it to the machine; 1 reads inline."""
+    global OCR_WORKERS, _digit_pool
+    OCR_WORKERS = workers
+    if _digit_pool is not None:
+        _digit_pool.shutdown(wait=True)
+        _digit_pool = None
+
+def _read_digits(gray, img, headers, scale, debug=False, recognizer=None, raw=None):
+    """
+    Read the number under each located header. `raw` is the captured frame
+    `gray` was equalized from, for the digit cache keys.
+    Returns (values, confidence, boxes, failed); confidence is the weakest
+    digit score of each reading.
+    """
+    stats = [s for s in STATS if s in headers]
+    boxes = {}
+    for stat in stats:
+        h, w = stat_pyramid[scale][stat].shape
+        boxes[stat] = _digit_box(*headers[stat], w, h)
         if debug:
+            x1, y1, x2, y2 = boxes[stat]
             cv2.rectangle(img, (x1, y1), (x2, y2), (0,255,0), 2)
 
-        num = match_digits(region, debug=debug, stat_name=stat)
+    def read(stat):
+        x1, y1, x2, y2 = boxes[stat]
+        return read_digits_scored(gray[y1:y2, x1:x2], debug=debug, stat_name=stat, scale=scale,
+                                  recognizer=recognizer,
+                                  raw=None if raw is None else raw[y1:y2, x1:x2])
+
+    if _digit_workers() == 1 or len(stats) == 1:
+        reads = [read(stat) for stat in stats]
+    else:
+        reads = list(_get_digit_pool().map(read, stats))
+    values, confidence, failed = {}, {}, []
+    for stat, (num, scores) in zip(stats, reads):
         if num is None:
+            failed.append(stat)
+            continue
+        values[stat] = num
+        confidence[stat] = min(scores)
+    return values, confidence, boxes, failed
+
+def _panel_box(layout, stats, size):
+    """Padded bbox (capture coords) around the headers and numbers of `stats`."""
+    xs, ys = [], []
+    scale = layout["scale"]
+    for stat in stats:
+        h, w = stat_pyramid[scale][stat].shape
+        x, y = layout["headers"][stat]
+        x1, y1, x2, y2 = layout["boxes"][stat]
+        xs += [x, x + w, x1, x2]
+        ys += [y, y + h, y1, y2]
+    pad = LAYOUT_ROI_PADDING
+    return (max(0, min(xs) - pad), max(0, min(ys) - pad),
+            min(size[0], max(xs) + pad), min(size[1], max(ys) + pad))
+
+def _remember_layout(size, scale, headers, boxes, lut):
+    layout = _layout_cache.get(size)
+    if layout is None or layout["scale"] != scale:
+        layout = {"scale": scale, "headers": {}, "boxes": {}}
+    layout["lut"] = lut
+    for stat, box in boxes.items():
+        layout["headers"][stat] = headers[stat]
+        layout["boxes"][stat] = box
+    if not layout["headers"]:
+        return
+    layout["panel"] = _panel_box(layout, list(layout["headers"]), size)
+    _layout_cache[size] = layout
+
+def _tick(timings, stage, t0):
+    """Add the time since `t0` to `timings[stage]` (if timing) and return now."""
+    now = time.perf_counter()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (now - t0)
+    return now
+
+def _read_anchored(win_box, size, layout, stats, debug=False, recognizer=None, timings=None):
+    """
+    Capture just the part of the panel holding `stats` and re-find their
+    headers near where they were last seen.
+    Returns (values, confidence, headers, boxes, failed, img), in capture
+    coordinates.
+    """
+    px1, py1, px2, py2 = _panel_box(layout, stats, size)
+    left, top = win_box[0], win_box[1]
+    scale = layout["scale"]
+    frame = _capture.grab(bbox=(left + px1, top + py1, left + px2, top + py2))
+    t = time.perf_counter()
+    img, gray, _ = _prepare(frame, debug, layout["lut"])
+    t = _tick(timings, "equalize", t)
+    anchors = {s: (layout["headers"][s][0] - px1, layout["headers"][s][1] - py1) for s in stats}
+    headers, missing = _find_headers_anchored(gray, anchors, LAYOUT_SEARCH_PADDING, scale)
+    t = _tick(timings, "headers", t)
+    values, confidence, boxes, unread = _read_digits(gray, img, headers, scale, debug, recognizer, frame)
+    _tick(timings, "digits", t)
+    # Back to capture coordinates for the cache
+    headers = {s: (x + px1, y + py1) for s, (x, y) in headers.items()}
+    boxes = {s: (x1 + px1, y1 + py1, x2 + px1, y2 + py1) for s, (x1, y1, x2, y2) in boxes.items()}
+    failed = [s for s in STATS if s in missing or s in unread]
+    return values, confidence, headers, boxes, failed, img
+
+def panel_fingerprint():
+    """
+    Tiny grayscale thumbnail of the cached stat panel, for cheap change
+    detection. Returns None until a scan has located the panel.
+    """
+    with _ocr_lock:
+        win_box = _capture.window_box()
+        if not win_box:
             return None
-        detected[stat] = num
+        size = (win_box[2] - win_box[0], win_box[3] - win_box[1])
+        layout = _layout_cache.get(size)
+        if not layout:
+            return None
+        px1, py1, px2, py2 = layout["panel"]
+        left, top = win_box[0], win_box[1]
+        frame = _capture.grab(bbox=(left + px1, top + py1, left + px2, top + py2))
+    return cv2.resize(frame, WATCH_FINGERPRINT_SIZE, interpolation=cv2.INTER_AREA)
 
-    if debug:
+def read_stats(debug=False, only=None, expected=None, recognizer=None, timings=None):
+    """
+    Scan the stat panel and return per-stat results:
+        {"values": {stat: int}, "confidence": {stat: float}, "failed": [stat, ...],
+         "implausible": {stat: rejected reading}, "retried": [stat, ...]}
+    Pass `only` (a list of stats) to re-scan just those, e.g. the ones that
+    failed last time; when the panel's layout is cached, only their part of
+    the screen is captured. Pass `expected` ({stat: (lo, hi)}, see
+    expected_ranges) to have out-of-range readings re-read ("retried") and,
+    if they still don't fit, reported as failed. Pass a `timings` dict to
+    have it filled with seconds spent equalizing, finding headers and
+    matching digits.
+    """
+    warm_up()
+    with _ocr_lock:
+        return _read_stats(debug, only, expected, recognizer, timings)
+
+def _read_stats(debug, only, expected, recognizer, timings=None):
+    wanted = [s for s in STATS if only is None or s in only]
+    result = {"values": {}, "confidence": {}, "failed": [], "implausible": {}, "retried": []}
+    win_box = _capture.window_box()
+    size = (win_box[2] - win_box[0], win_box[3] - win_box[1]) if win_box else None
+
+    todo = wanted
+    img = None
+    layout = _layout_cache.get(size) if size else None
+    anchored = [s for s in todo if layout and s in layout["headers"]]
+    if anchored:
+        values, confidence, headers, boxes, failed, img = _read_anchored(
+            win_box, size, layout, anchored, debug, recognizer, timings)
+        result["values"].update(values)
+        result["confidence"].update(confidence)
+        if headers:
+            _remember_layout(size, layout["scale"], headers, boxes, layout["lut"])
+        else:
+            print("[INFO] Stat panel moved; falling back to full-frame search.")
+            _layout_cache.pop(size, None)
+        # Headers that were found but whose numbers didn't read stay failed;
+        # a full-frame search would only land on the same spot.
+        todo = [s for s in todo if s not in anchored or s not in headers]
+
+    if todo:
+        frame = _capture.grab(bbox=win_box)
+        t = time.perf_counter()
+        img, gray, lut = _prepare(frame, debug)
+        _tick(timings, "equalize", t)
+        values, confidence, found = _read_full_frame(gray, img, debug, timings, todo, recognizer, frame)
+        result["values"].update(values)
+        result["confidence"].update(confidence)
+        if size:
+            _remember_layout(size, *found, lut)
+
+    result["failed"] = [s for s in wanted if s not in result["values"]]
+    if debug and img is not None:
         cv2.imwrite("debug_template_boxes.png", img)
-    return detected
+    if expected:
+        _check_plausible(result, expected, debug)
+    return result
+
+def expected_ranges(prev_stats, gain_record=None):
+    """
+    Plausible (lo, hi) per stat for this turn: last turn's value plus the
+    gains learned for the action taken since (a profile's action_stats
+    entry), or a generic bound until PLAUSIBLE_MIN_SAMPLES turns are recorded.
+    Once the gains' spread is known too, the bound follows it instead of a
+    fixed multiple of the mean.
+    """
+    from .profiles import gain_stats
+    learned = gain_record if gain_record and gain_record.get("count", 0) >= PLAUSIBLE_MIN_SAMPLES else None
+    ranges = {}
+    for stat, prev in prev_stats.items():
+        if learned:
+            g = gain_stats(learned, stat)
+            if g["n"] >= PLAUSIBLE_MIN_SAMPLES:
+                max_gain = max(g["max"], g["mean"] + PLAUSIBLE_GAIN_SIGMAS * g["std"]) + PLAUSIBLE_GAIN_SLACK
+            else:
+                max_gain = g["mean"] * PLAUSIBLE_GAIN_FACTOR + PLAUSIBLE_GAIN_SLACK
+        else:
+            max_gain = PLAUSIBLE_MAX_GAIN
+        ranges[stat] = (max(0, prev - PLAUSIBLE_MAX_DROP), min(MAX_STAT_VALUE, round(prev + max_gain)))
+    return ranges
+
+def _check_plausible(result, expected, debug=False):
+    """
+    Re-read each out-of-range stat once, on a fresh capture and with the
+    other recognizer. Readings that still don't fit move to "failed".
+    """
+    def fits(stat, value):
+        lo, hi = expected[stat]
+        return lo <= value <= hi
+
+    bad = [s for s, v in result["values"].items() if s in expected and not fits(s, v)]
+    if not bad:
+        return
+    result["retried"] = bad
+    print("[INFO] Implausible readings " +
+          ", ".join(f"{s}={result['values'][s]} (expected {expected[s][0]}-{expected[s][1]})" for s in bad) +
+          "; re-reading them.")
+    other = "components" if DIGIT_RECOGNIZER == "template" else "template"
+    retry = read_stats(debug, only=bad, recognizer=other)
+    for stat in bad:
+        value = retry["values"].get(stat)
+        if value is not None and fits(stat, value):
+            result["values"][stat] = value
+            result["confidence"][stat] = retry["confidence"][stat]
+        else:
+            result["implausible"][stat] = result["values"].pop(stat)
+            result["confidence"].pop(stat, None)
+    result["failed"] = [s for s in STATS if s in result["failed"] or s in result["implausible"]]
+
+def auto_read_stats(debug=False):
+    """All five stats as {stat: int}, or None if any of them failed to read."""
+    result = read_stats(debug=debug)
+    return None if result["failed"] else result["values"]
+
+def _read_full_frame(gray, img, debug=False, timings=None, stats=STATS, recognizer=None, raw=None):
+    t = time.perf_counter()
+    scale = _pick_scale(gray)
+    headers, _ = _find_headers(gray, scale)
+    headers = {s: pos for s, pos in headers.items() if s in stats}
+    t = _tick(timings, "headers", t)
+    values, confidence, boxes, _ = _read_digits(gray, img, headers, scale, debug, recognizer, raw)
+    _tick(timings, "digits", t)
+    return values, confidence, (scale, headers, boxes)
+
+# === Batch mode: python -m stat_planner.ocr ===
+
+def _iter_images(inputs):
+    import glob
+    from pathlib import Path
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for p in sorted(path.iterdir()):
+                if p.suffix.lower() in IMAGE_EXTS:
+                    yield str(p)
+        else:
+            for p in glob.iglob(item, recursive=True):
+                if Path(p).suffix.lower() in IMAGE_EXTS:
+                    yield p
+
+def _batch_init():
+    import sys
+    # stdout carries the JSONL; worker diagnostics ([INFO] scale picks etc.) go to stderr
+    sys.stdout = sys.stderr
+    # One process per core already; keep each worker single-threaded
+    cv2.setNumThreads(1)
+    set_ocr_workers(1)
+    # Each worker replays its images through one in-memory capture, so
+    # same-sized screenshots reuse the cached layout like live scans do
+    set_capture_backend(ArrayCapture())
+    warm_up()
+
+def _batch_read(path):
+    # One bad image mustn't take the rest of the batch down with it
+    t0 = time.perf_counter()
+    try:
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            return {"image": path, "stats": None, "error": "unreadable image"}
+        _capture.set_frame(img)
+        result = read_stats()
+    except Exception as e:
+        return {"image": path, "stats": None, "error": f"{type(e).__name__}: {e}"}
+    # Partial readings are kept; "failed" lists the stats that didn't read
+    return {"image": path, "stats": result["values"], "failed": result["failed"],
+            "ms": round((time.perf_counter() - t0) * 1000, 2)}
+
+def main(argv=None):
+    import argparse
+    import json
+    import sys
+    from multiprocessing import Pool
+    parser = argparse.ArgumentParser(
+        prog="python -m stat_planner.ocr",
+        description="Read stats from saved screenshots and write one JSON line per image.")
+    parser.add_argument("inputs", nargs="+", help="Image directories or glob patterns")
+    parser.add_argument("-o", "--out", help="JSONL output file (default: stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    # Workers must reference the importable module, not __main__
+    from stat_planner import ocr as worker_mod
+    out = open(args.out, "w") if args.out else sys.stdout
+    done = failed = partial = 0
+    t0 = time.perf_counter()
+    try:
+        with Pool(args.jobs, initializer=worker_mod._batch_init) as pool:
+            for rec in pool.imap_unordered(worker_mod._batch_read, _iter_images(args.inputs), chunksize=4):
+                out.write(json.dumps(rec) + "\n")
+                out.flush()
+                done += 1
+                failed += not rec["stats"]
+                partial += bool(rec["stats"] and rec["failed"])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - t0
+    rate = done / elapsed if elapsed else 0.0
+    print(f"[INFO] {done} images ({failed} failed, {partial} partial) in {elapsed:.1f}s — {rate:.1f} images/s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
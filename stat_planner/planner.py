@@ -4,89 +4,149 @@ from .settings import (
     CATCHUP_THRESHOLD, CATCHUP_BOOST,
     OVERSHOOT_THRESHOLD, OVERSHOOT_PENALTY_SCALE
 )
-import math
-from .profiles import load_profiles
+import numpy as np
+from .profiles import get_profile
+
+# === Batch scoring ===
+# Stats are columns in STATS order; every argument broadcasts against (N, len(STATS)).
+# `params` optionally overrides the weight settings by name (e.g. {"CATCHUP_BOOST": 2.0}),
+# which is how tune.py tries out candidate weights.
+
+def _param(params, name, default):
+    return params[name] if params and name in params else default
+
+def stats_vector(stats):
+    """{stat: value} -> array in STATS order."""
+    return np.array([stats[s] for s in STATS], dtype=np.float64)
+
+def priority_vector(priorities=None, params=None):
+    """{stat: priority name} -> per-stat priority multiplier."""
+    names = priorities or {}
+    table = _param(params, "PRIORITY_WEIGHTS", PRIORITY_WEIGHTS)
+    scale = _param(params, "PRIORITY_WEIGHT_SCALE", PRIORITY_WEIGHT_SCALE)
+    return np.array([table.get(names.get(s, "Normal"), 1.0) * scale for s in STATS])
+
+def feedback_vector(feedback=None):
+    """Feedback stat name (or None) -> boolean mask over STATS."""
+    return np.array([s == feedback for s in STATS])
+
+def loss_vector(loss_reasons=None):
+    """{stat: loss count} -> counts in STATS order (0 where missing)."""
+    reasons = loss_reasons or {}
+    return np.array([reasons.get(s, 0) for s in STATS], dtype=np.float64)
+
+def _score_arrays(current, ideal, priority_weights=1.0, feedback=False, loss_counts=0.0,
+                  loss_reason_weight=None, params=None):
+    """All the intermediate arrays of the scoring, in suggest_training's order of operations."""
+    lw = loss_reason_weight if loss_reason_weight is not None else _param(params, "LOSS_REASON_WEIGHT", LOSS_REASON_WEIGHT)
+    catchup_threshold = _param(params, "CATCHUP_THRESHOLD", CATCHUP_THRESHOLD)
+    overshoot_threshold = _param(params, "OVERSHOOT_THRESHOLD", OVERSHOOT_THRESHOLD)
+    penalty_scale = _param(params, "OVERSHOOT_PENALTY_SCALE", OVERSHOOT_PENALTY_SCALE)
+    current = np.asarray(current, dtype=np.float64)
+    progress = current / np.asarray(ideal, dtype=np.float64)
+    gap = 1.0 - progress
+    weights = np.broadcast_to(np.asarray(priority_weights, dtype=np.float64), progress.shape).copy()
+    catchup = progress < catchup_threshold
+    weights[catchup] *= _param(params, "CATCHUP_BOOST", CATCHUP_BOOST)
+    overshoot = progress > overshoot_threshold
+    penalty = np.where(overshoot, 1.0 + penalty_scale * (progress / overshoot_threshold - 1.0), 1.0)
+    weights[overshoot] /= penalty[overshoot]
+    weights += np.where(feedback, _param(params, "FEEDBACK_WEIGHT", FEEDBACK_WEIGHT), 0.0)
+    weights += lw * np.asarray(loss_counts, dtype=np.float64)
+    return {"progress": progress, "catchup": catchup, "overshoot": overshoot, "penalty": penalty,
+            "weights": weights, "weighted_gaps": gap * weights}
+
+def score_states(current, ideal, priority_weights=1.0, feedback=False, loss_counts=0.0,
+                 loss_reason_weight=None, params=None):
+    """
+    Score N states at once; identical results to calling suggest_training on each.
+
+    Parameters (arrays broadcast against (N, len(STATS)), columns in STATS order):
+        current, ideal: stat values (see stats_vector).
+        priority_weights: priority multipliers (see priority_vector).
+        feedback: boolean mask of the feedback stat (see feedback_vector).
+        loss_counts: loss-reason counts (see loss_vector).
+        loss_reason_weight (float): Multiplier for loss reason boost.
+        params (dict): Weight settings to use instead of settings.py, by name.
 
-def suggest_training(current, ideal, turns, feedback=None, profile_index=None, priorities=None, loss_reason_weight=None):
+    Returns:
+        tuple: (best, weighted_gaps, weights) where best holds the index into
+        STATS of the suggested stat for each state.
+    """
+    arrays = _score_arrays(current, ideal, priority_weights, feedback, loss_counts, loss_reason_weight, params)
+    weighted = arrays["weighted_gaps"]
+    # argmax keeps the first of equal scores, like the strict > in the loop it replaced
+    return weighted.argmax(axis=-1), weighted, arrays["weights"]
+
+def suggest_training(current, ideal, turns, feedback=None, profile_index=None, priorities=None, loss_reason_weight=None,
+                     lookahead=False):
     """
     Suggests which stat to train next based on gap-to-ideal and weighting factors.
 
     Parameters:
         current (dict): Current stats {stat_name: value}.
         ideal (dict): Ideal target stats {stat_name: value}.
-        turns (int): Remaining turns (not directly used here).
+        turns (int): Remaining turns before the next race (searched when lookahead is on).
         feedback (str): Last feedback stat (optional).
         profile_index (int): Index of profile to load loss reasons from (optional).
         priorities (dict): User-defined priorities for each stat.
         loss_reason_weight (float): Multiplier for loss reason boost.
+        lookahead (bool): Search the remaining turns (see lookahead.py) instead
+            of picking greedily; debug_weights still describe this turn.
 
     Returns:
         tuple: (best_stat, reason_string, debug_weights)
     """
     loss_reasons = None
+    action_stats = None
 
     # Load profile analytics if available
     if profile_index is not None:
-        analytics = load_profiles()[profile_index].get("analytics", {})
+        analytics = get_profile(profile_index).get("analytics", {})
         loss_reasons = analytics.get("loss_reasons", {})
-
-    best_stat, best_score = None, float("-inf")
+        action_stats = analytics.get("action_stats", {})
+
+    score_args = dict(priority_weights=priority_vector(priorities), feedback=feedback_vector(feedback),
+                      loss_counts=loss_vector(loss_reasons), loss_reason_weight=loss_reason_weight)
+    arrays = _score_arrays(stats_vector(current), stats_vector(ideal), **score_args)
+    weights, weighted = arrays["weights"], arrays["weighted_gaps"]
+    best = int(weighted.argmax())
+    best_stat, best_score = STATS[best], float(weighted[best])
     debug_weights = {}
 
     print("[DEBUG] Suggestion calculations:")
-    for stat in STATS:
-        progress = current[stat] / ideal[stat]
-        gap = 1.0 - progress  # Larger gap = further behind
-        user_weight = 1.0
-        note_parts = []
-
-        # Priority weight
-        priority = priorities.get(stat, "Normal") if priorities else "Normal"
-        priority_weight = PRIORITY_WEIGHTS.get(priority, 1.0) * PRIORITY_WEIGHT_SCALE
-        user_weight *= priority_weight
-        note_parts.append(f"Priority: {priority}")
-
-        # Catch-up boost
-        if progress < CATCHUP_THRESHOLD:
-            user_weight *= CATCHUP_BOOST
+    for i, stat in enumerate(STATS):
+        note_parts = [f"Priority: {priorities.get(stat, 'Normal') if priorities else 'Normal'}"]
+        if arrays["catchup"][i]:
             note_parts.append("Catch-up boost")
-
-        # Overshoot penalty
-        if progress > OVERSHOOT_THRESHOLD:
-            overshoot_ratio = progress / OVERSHOOT_THRESHOLD
-            penalty = 1.0 + OVERSHOOT_PENALTY_SCALE * (overshoot_ratio - 1.0)
-            user_weight /= penalty
-            note_parts.append(f"Overshoot {penalty:.2f}x")
-
-        # Feedback weight
+        if arrays["overshoot"][i]:
+            note_parts.append(f"Overshoot {arrays['penalty'][i]:.2f}x")
         if feedback == stat:
-            user_weight += FEEDBACK_WEIGHT
             note_parts.append("Feedback boost")
-
-        # Loss reason weight
         if loss_reasons and stat in loss_reasons:
-            lw = loss_reason_weight if loss_reason_weight is not None else LOSS_REASON_WEIGHT
-            boost = lw * loss_reasons[stat]
-            user_weight += boost
             note_parts.append("Loss reason boost")
-
-        # Final score for this stat
-        weighted_gap = gap * user_weight
+        user_weight, weighted_gap = float(weights[i]), float(weighted[i])
         debug_weights[stat] = (user_weight, weighted_gap, "; ".join(note_parts))
-
         print(f"  {stat.capitalize():8}: Gap Δ {weighted_gap:.3f} (Weight: {user_weight:.2f}, {', '.join(note_parts)})")
 
-        # Select if best
-        if weighted_gap > best_score:
-            best_score = weighted_gap
-            best_stat = stat
-
     print(f"Selected: {best_stat.capitalize()} with total score {best_score:.3f}\n")
 
     reason = (
         f"Maximizes reduction of weighted stat gaps (priorities, feedback, "
         f"loss history, catch-up, overshoot considered, {best_score:.2f})"
     )
+    if lookahead:
+        from .lookahead import lookahead as search
+        result = search(stats_vector(current), stats_vector(ideal), turns, action_stats, **score_args)
+        if result:
+            # Train was clicked, so pick the best stat even if resting would score higher
+            values = result["values"]
+            best_stat = max(STATS, key=values.get)
+            reason = (f"Best expected weighted-gap progress over the next {result['depth']} turns "
+                      f"({values[best_stat]:.3f}, {result['nodes']} states in {result['ms']:.0f} ms)")
+            if values["recover"] > values[best_stat]:
+                reason += "; recovering would score higher"
+            print(f"[DEBUG] Lookahead: {result}")
     return best_stat, reason, debug_weights
 
 
@@ -1,21 +1,76 @@
+import atexit
 import json
+import math
+import os
 import shutil
 from pathlib import Path
-from .settings import BASE_PATH
+from . import settings
+from .settings import BASE_PATH, GAIN_BUCKET_TURNS
 
 PROFILES_FILE = BASE_PATH / "profiles.json"
 PHOTOS_DIR    = BASE_PATH / "assets" / "profiles"
 
+# Process-wide profile store: profiles.json is parsed once and every read
+# after that is served from memory. Changes mark their profile dirty and
+# flush_profiles() writes them back, so analytics events don't each
+# re-parse and rewrite the whole file. Rare events (feedback, loss reasons)
+# flush straight away; learned gains are flushed by the scan that records them.
+_profiles = None
+_dirty = set()   # indices of profiles changed since the last flush
+
 def load_profiles():
+    """Read profiles.json from disk. Use get_profiles() for the shared copy."""
     PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
+    if settings.STORAGE_BACKEND == "sqlite":
+        from . import database
+        return database.load_profiles()
     if not PROFILES_FILE.exists():
         return []
     with open(PROFILES_FILE, "r") as f:
         return json.load(f)
 
-def save_profiles(profiles):
-    with open(PROFILES_FILE, "w") as f:
+def save_profiles(profiles, indices=None):
+    """
+    Write `profiles` to profiles.json, replacing it atomically. With the
+    SQLite backend only the rows of `indices` (all profiles if None) are written.
+    """
+    if settings.STORAGE_BACKEND == "sqlite":
+        from . import database
+        database.save_profiles(profiles, indices)
+        return
+    tmp = PROFILES_FILE.with_name(PROFILES_FILE.name + ".tmp")
+    with open(tmp, "w") as f:
         json.dump(profiles, f, indent=2)
+    os.replace(tmp, PROFILES_FILE)
+
+def get_profiles():
+    global _profiles
+    if _profiles is None:
+        _profiles = load_profiles()
+        for i, profile in enumerate(_profiles):
+            if migrate_action_stats(profile):
+                mark_dirty(i)
+    return _profiles
+
+def get_profile(profile_index):
+    return get_profiles()[profile_index]
+
+def get_analytics(profile_index):
+    return get_profile(profile_index).setdefault("analytics", {})
+
+def mark_dirty(profile_index):
+    _dirty.add(profile_index)
+
+def flush_profiles():
+    """Write pending changes to disk. Returns True if anything was written."""
+    if not _dirty or _profiles is None:
+        return False
+    save_profiles(_profiles, _dirty)
+    _dirty.clear()
+    return True
+
+# Anything still pending (e.g. a migration) is written on exit
+atexit.register(flush_profiles)
 
 def add_profile(name, ideal_stats, photo_path=None):
     """
@@ -23,7 +78,7 @@ def add_profile(name, ideal_stats, photo_path=None):
     - ideal_stats: dict of stat->int
     - photo_path: optional str path to image file
     """
-    profiles = load_profiles()
+    profiles = get_profiles()
     # Copy photo into assets/profiles if given
     dest_photo = None
     if photo_path:
@@ -36,34 +91,106 @@ def add_profile(name, ideal_stats, photo_path=None):
         "ideal_stats": ideal_stats,
         "photo": dest_photo
     })
-    save_profiles(profiles)
+    mark_dirty(len(profiles) - 1)
+    flush_profiles()
     return profiles
 
+# === Gain statistics ===
+# Each action_stats entry keeps, besides the running "count" and summed "gains",
+# a streaming summary per stat: Welford mean/M2 plus min/max, all updated in O(1).
+# "n" counts the gains in the summary; entries recorded before it existed
+# start at n=0 (their spread is unknown) while "gains"/"count" keep the exact mean.
+# With GAIN_BUCKET_TURNS set, "buckets" holds the same per turn range of the run.
+
+def _empty_summary():
+    return {"n": 0, "mean": 0.0, "m2": 0.0, "min": None, "max": None}
+
+def _update_summary(summary, x):
+    summary["n"] += 1
+    delta = x - summary["mean"]
+    summary["mean"] += delta / summary["n"]
+    summary["m2"] += delta * (x - summary["mean"])
+    summary["min"] = x if summary["min"] is None else min(summary["min"], x)
+    summary["max"] = x if summary["max"] is None else max(summary["max"], x)
+
+def _new_record(stats):
+    return {"count": 0, "gains": {s: 0 for s in stats}, "summary": {s: _empty_summary() for s in stats}}
+
+def migrate_action_stats(profile):
+    """Add the streaming summaries to action_stats entries saved without them. Returns True if changed."""
+    changed = False
+    for record in profile.get("analytics", {}).get("action_stats", {}).values():
+        summary = record.setdefault("summary", {})
+        for s in record["gains"]:
+            if s not in summary:
+                summary[s] = _empty_summary()
+                changed = True
+    return changed
+
 def ensure_action_stats(profile):
     analytics = profile.setdefault("analytics", {})
     action_stats = analytics.setdefault("action_stats", {})
-    for stat in profile["ideal_stats"]:
-        action_stats.setdefault(stat, {
-            "count": 0,
-            "gains": {s: 0 for s in profile["ideal_stats"]}
-        })
+    for stat in [*profile["ideal_stats"], "recover"]:
+        action_stats.setdefault(stat, _new_record(profile["ideal_stats"]))
     return analytics
 
-def record_action_gain(profile_index, action, prev_stats, new_stats):
-    profiles = load_profiles()
-    profile = profiles[profile_index]
+def record_action_gain(profile_index, action, prev_stats, new_stats, turn=None):
+    profile = get_profile(profile_index)
     analytics = ensure_action_stats(profile)
     astats = analytics["action_stats"][action]
-    astats["count"] += 1
-    for s, new_v in new_stats.items():
-        astats["gains"][s] += max(0, new_v - prev_stats.get(s, 0))
-    save_profiles(profiles)
+    bucket = None
+    if turn is not None and GAIN_BUCKET_TURNS:
+        buckets = astats.setdefault("buckets", {})
+        bucket = buckets.setdefault(str(turn // GAIN_BUCKET_TURNS), _new_record(profile["ideal_stats"]))
+    for record in (astats, bucket):
+        if record is None:
+            continue
+        record["count"] += 1
+        for s, new_v in new_stats.items():
+            gain = max(0, new_v - prev_stats.get(s, 0))
+            record["gains"][s] += gain
+            _update_summary(record.setdefault("summary", {}).setdefault(s, _empty_summary()), gain)
+    mark_dirty(profile_index)
+
+def gain_stats(record, stat):
+    """
+    Learned gain of `stat` for one action_stats entry (or bucket):
+    {"count", "mean", "n", "std", "min", "max"}. `n` is the number of gains
+    in the streaming summary; std needs two of them, min/max one.
+    """
+    count = record.get("count", 0) if record else 0
+    summary = (record or {}).get("summary", {}).get(stat) or _empty_summary()
+    n = summary["n"]
+    return {
+        "count": count,
+        "mean": record["gains"].get(stat, 0) / count if count else 0.0,
+        "n": n,
+        "std": math.sqrt(summary["m2"] / (n - 1)) if n >= 2 else None,
+        "min": summary["min"],
+        "max": summary["max"],
+    }
+
+def bucket_record(record, turn):
+    """The per-turn-bucket entry of an action_stats entry covering `turn`, if recorded."""
+    if not record or not GAIN_BUCKET_TURNS:
+        return None
+    return record.get("buckets", {}).get(str(turn // GAIN_BUCKET_TURNS))
 
 def record_feedback(profile_index, stat, loss=False):
-    profiles = load_profiles()
-    profile = profiles[profile_index]
-    analytics = profile.setdefault("analytics", {})
+    analytics = get_analytics(profile_index)
     key = "loss_feedback" if loss else "optional_feedback"
     feedbacks = analytics.setdefault(key, {})
     feedbacks[stat] = feedbacks.get(stat, 0) + 1
-    save_profiles(profiles)
+    mark_dirty(profile_index)
+    flush_profiles()
+
+def record_loss_reason(profile_index, stat):
+    loss_reasons = get_analytics(profile_index).setdefault("loss_reasons", {})
+    loss_reasons[stat] = loss_reasons.get(stat, 0) + 1
+    mark_dirty(profile_index)
+    flush_profiles()
+
+def clear_analytics(profile_index):
+    get_profile(profile_index)["analytics"] = {}
+    mark_dirty(profile_index)
+    flush_profiles()
@@ -7,10 +7,22 @@ DIGIT_TEMPLATE_DIR  = BASE_PATH / "assets" / "digits"
 ICON_DIR            = BASE_PATH / "assets" / "icons"
 ICON_PATH           = ICON_DIR / "app_icon.ico"
 PROFILES_FILE       = BASE_PATH / "profiles.json"
+DATABASE_FILE       = BASE_PATH / "stat_planner.db"   # Used when STORAGE_BACKEND = "sqlite"
 PHOTOS_DIR          = BASE_PATH / "assets" / "profiles"
+ASSET_BUNDLE        = BASE_PATH / "assets" / "assets.npz"   # Built by `python -m stat_planner.assets`
+
+# === Storage ===
+STORAGE_BACKEND     = "json"   # "json": profiles.json + run_state.json; "sqlite": DATABASE_FILE (see database.py)
+
+# === Autosave journal ===
+AUTOSAVE                = True   # Journal every turn so a run survives a crash (see journal.py)
+JOURNAL_FSYNC_EVERY     = 8      # fsync the journal after this many records, at the end of a turn...
+JOURNAL_FSYNC_INTERVAL_S = 2.0   # ...or once pending records are this old (checked by a timer while idle)
+JOURNAL_COMPACT_EVERY   = 200    # Fold the journal into the snapshot after this many records
 
 # === Screenshot Settings ===
 GAME_EXE = "UmamusumePrettyDerby.exe"  # Changeable via future GUI
+WINDOW_MISS_RETRY_S = 2.0   # How long a "window not found" result is reused before rescanning
 
 
 # === Stats & thresholds ===
@@ -18,6 +30,56 @@ STATS                   = ["speed", "stamina", "power", "guts", "wit"]
 FEEDBACK_WEIGHT         = 2
 MATCH_THRESHOLD         = 0.4
 DIGIT_MATCH_THRESHOLD   = 0.6
+DIGIT_MIN_SPACING       = 10     # Min px between two digit hits before one is suppressed
+MAX_STAT_VALUE          = 1200
+
+# === Digit recognizer ===
+DIGIT_RECOGNIZER        = "template"   # "template" (matchTemplate sweep) or "components" (glyph classifier)
+GLYPH_SIZE              = (12, 16)     # (w, h) glyphs are normalized to before comparison
+GLYPH_MIN_HEIGHT        = 0.6          # Component height range, relative to the digit template height
+GLYPH_MAX_HEIGHT        = 1.5
+GLYPH_MIN_SCORE         = 0.6          # Reject the reading if any glyph matches worse than this
+GLYPH_DARK_TEXT         = True         # Numbers assumed dark on a light panel; not yet checked on real captures
+DIGIT_CACHE_SIZE        = 64           # Recent number-region readings reused when the pixels match; 0 = off
+
+# === Template pyramid ===
+TEMPLATE_BASE_HEIGHT    = 1080   # Window height the template PNGs were cut at
+TEMPLATE_SCALES         = [round(0.5 + 0.1 * i, 1) for i in range(11)]  # 0.5x .. 1.5x
+SCALE_PROBE_LEVELS      = 3      # Levels nearest the size-based guess probed first
+SCALE_MISS_RETRY_S      = 2.0    # How long a capture size with no panel skips the pyramid probe
+ASSET_BUNDLE_VERSION    = 1      # Bump when the bundle layout changes; older bundles are ignored
+
+# === OCR threading ===
+OCR_WORKERS             = None   # Digit-phase threads; None = one per stat up to CPU count, 1 = inline
+
+# === Startup ===
+OCR_WARMUP              = True   # Load the OCR engine in the background after the window shows
+OCR_WARMUP_DELAY_MS     = 500
+STARTUP_BUDGET_MS       = 1500   # Cold-start target checked by `--startup-report`
+
+# === Layout cache ===
+LAYOUT_ROI_PADDING      = 40     # px of slack captured around the cached stat panel
+LAYOUT_SEARCH_PADDING   = 12     # px each header may drift before a full-frame search
+
+# === Plausibility filter ===
+PLAUSIBLE_MAX_DROP      = 30     # A reading this far below last turn's value is treated as a misread
+PLAUSIBLE_MAX_GAIN      = 100    # One-turn gain allowed before an action's gains have been learned
+PLAUSIBLE_GAIN_FACTOR   = 2.5    # Once learned: allow this multiple of the action's mean gain...
+PLAUSIBLE_GAIN_SLACK    = 30     # ...plus this much for events and bonuses
+PLAUSIBLE_GAIN_SIGMAS   = 4      # With a learned spread: allow max(largest seen, mean + this many std) + slack
+PLAUSIBLE_MIN_SAMPLES   = 3      # Recorded turns of an action before its learned gains are used
+PLAUSIBLE_AUTO_CONFIRM  = True   # Confirm a scan straight away when every stat is in a learned range...
+PLAUSIBLE_AUTO_CONFIRM_SAMPLES = 10   # ...learned from at least this many turns, and nothing was re-read
+
+# === Gain statistics ===
+GAIN_BUCKET_TURNS       = 6      # Also keep per-action gains per block of this many turns (0 = off)
+
+# === Watch mode ===
+WATCH_INTERVAL_MS       = 400    # Panel fingerprint poll interval
+WATCH_SEARCH_INTERVAL_MS = 3000  # Full-frame retry interval while the panel isn't located...
+WATCH_SEARCH_MAX_INTERVAL_MS = 30000   # ...doubling after each miss up to this
+WATCH_FINGERPRINT_SIZE  = (48, 12)
+WATCH_CHANGE_THRESHOLD  = 4.0    # Mean abs grey-level difference that counts as a change
 
 # === Training Suggestion Weights ===
 PRIORITY_WEIGHTS = {
@@ -37,3 +99,49 @@ CATCHUP_BOOST = 1.6            # 60% weight increase for lagging stats
 # Overshoot penalty: applies when stat exceeds this % of ideal
 OVERSHOOT_THRESHOLD = 0.85     # Start penalizing at 85% of ideal
 OVERSHOOT_PENALTY_SCALE = 3    # Penalty multiplier for overtrained stats
+
+# === Lookahead planner ===
+LOOKAHEAD_ENABLED       = False  # Default state of the "Lookahead" checkbox
+LOOKAHEAD_DEPTH         = 4      # Max turns searched (never past the next race)
+LOOKAHEAD_TIME_BUDGET_MS = 250   # Stop deepening once a search level takes us past this
+LOOKAHEAD_MAX_NODES     = 200000 # Unique states kept across all search levels
+LOOKAHEAD_MIN_SAMPLES   = 3      # Recorded turns of an action before its learned gains are used
+LOOKAHEAD_DEFAULT_GAIN  = 20     # Assumed gain on the trained stat until then
+LOOKAHEAD_GAIN_SPREAD   = 0.5    # Outcomes modelled as mean x (1 - spread, 1, 1 + spread)
+
+# === Run simulator ===
+SIM_START_STAT          = 100    # Starting value of every stat unless given
+SIM_RACE_REQUIREMENT    = (0.2, 0.8)   # Mean progress (of ideal) that makes a race a coin flip: first round .. Final
+SIM_RACE_SOFTNESS       = 0.05   # Width of the pass-probability curve around that requirement
+SIM_CHUNK_RUNS          = 2000   # Runs simulated together per worker task
+
+# === Tuned weight overrides ===
+# `python -m stat_planner.tune` writes its best weights here; they replace the values above
+TUNABLE_SETTINGS = [
+    "PRIORITY_WEIGHTS", "CATCHUP_THRESHOLD", "CATCHUP_BOOST", "OVERSHOOT_THRESHOLD",
+    "OVERSHOOT_PENALTY_SCALE", "FEEDBACK_WEIGHT", "LOSS_REASON_WEIGHT",
+]
+PLANNER_OVERRIDES_FILE  = BASE_PATH / "planner_overrides.json"
+# The values above as written here, before any overrides (tune.py spreads priorities from these)
+TUNABLE_DEFAULTS = {name: globals()[name] for name in TUNABLE_SETTINGS}
+
+def _load_overrides(path=PLANNER_OVERRIDES_FILE):
+    # Loaded at import so that pool workers (simulate, tune) plan with the same
+    # weights as the app; only the main process says so.
+    import json
+    from multiprocessing import parent_process
+    if not path.exists():
+        return
+    try:
+        with open(path, "r") as f:
+            overrides = json.load(f)["settings"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] Ignoring planner overrides in {path}: {e}")
+        return
+    for name, value in overrides.items():
+        if name in TUNABLE_SETTINGS:
+            globals()[name] = value
+    if parent_process() is None:
+        print(f"[INFO] Loaded tuned planner weights from {path.name}")
+
+_load_overrides()
@@ -0,0 +1,183 @@
+"""
+Monte Carlo run simulator.
+
+Plays complete runs of a trainee: training turns picked by the
+suggest_training policy, gains drawn from the profile's learned
+action_stats, then the race at the end of each block of turns, from the
+preliminary rounds through the Final. Runs are simulated in lockstep as
+arrays and spread over a process pool.
+
+    python -m stat_planner.simulate "Trainee name" --rounds 3 --turns 6 --runs 20000
+"""
+import os
+import time
+import numpy as np
+from .settings import (
+    STATS, MAX_STAT_VALUE, SIM_START_STAT, SIM_RACE_REQUIREMENT, SIM_RACE_SOFTNESS, SIM_CHUNK_RUNS
+)
+from .planner import score_states, stats_vector, priority_vector, loss_vector, race_stage
+from .lookahead import action_outcomes, OUTCOME_PROBS
+
+def _race_win_prob(progress, race, races):
+    """
+    Chance of passing race number `race` (0-based) of `races`: a logistic
+    curve around a requirement that rises from the first round to the Final.
+    `progress` is current/ideal per stat, capped at 1.
+    """
+    lo, hi = SIM_RACE_REQUIREMENT
+    need = lo + (hi - lo) * (race / max(1, races - 1))
+    return 1.0 / (1.0 + np.exp(-(progress.mean(axis=-1) - need) / SIM_RACE_SOFTNESS))
+
+def simulate_chunk(config, runs, seed):
+    """
+    Simulate `runs` runs of `config` (see make_config) in lockstep.
+    Returns (final_stats, races_passed, loss_reason) arrays; loss_reason is
+    the index into STATS of the weakest stat at the lost race, or -1 for a win.
+    """
+    rng = np.random.default_rng(seed)
+    ideal = np.asarray(config["ideal"], dtype=np.float64)
+    stats = np.tile(np.asarray(config["start"], dtype=np.float64), (runs, 1))
+    gains = action_outcomes(config["action_stats"])[:len(STATS)]   # Train actions only
+    priorities = np.asarray(config["priority_weights"])
+    losses = np.asarray(config["loss_counts"])
+    feedback = np.zeros((runs, len(STATS)), dtype=bool)
+    alive = np.ones(runs, dtype=bool)
+    passed = np.zeros(runs, dtype=np.int64)
+    loss_reason = np.full(runs, -1, dtype=np.int64)
+    races = config["rounds"] + 3   # preliminary rounds, then Quarter, Semi and Final
+    rows = np.arange(runs)
+
+    for race in range(races):
+        for _ in range(config["turns"]):
+            best, _, _ = score_states(stats, ideal, priorities, feedback, losses,
+                                      config["loss_reason_weight"], config.get("params"))
+            outcome = rng.choice(len(OUTCOME_PROBS), size=runs, p=OUTCOME_PROBS)
+            gain = gains[best, outcome] * alive[:, None]
+            stats = np.minimum(stats + gain, MAX_STAT_VALUE)
+        progress = np.minimum(stats / ideal, 1.0)
+        won = rng.random(runs) < _race_win_prob(progress, race, races)
+        lost = alive & ~won
+        loss_reason[lost] = progress[lost].argmin(axis=1)
+        alive &= won
+        passed += alive
+        # The game points at the weakest stat after a race; train towards it
+        feedback[:] = False
+        feedback[rows, progress.argmin(axis=1)] = alive
+    return np.rint(stats).astype(np.int64), passed, loss_reason
+
+def _run_chunk(args):
+    return simulate_chunk(*args)
+
+def make_config(ideal, rounds, turns, start=None, analytics=None, priorities=None, loss_reason_weight=None,
+                params=None):
+    """Everything a worker needs, as plain picklable values. `params` overrides weight settings by name."""
+    analytics = analytics or {}
+    return {
+        "ideal": stats_vector(ideal).tolist(),
+        "start": stats_vector(start).tolist() if start else [SIM_START_STAT] * len(STATS),
+        "rounds": rounds,
+        "turns": turns,
+        "action_stats": analytics.get("action_stats", {}),
+        "priority_weights": priority_vector(priorities, params).tolist(),
+        "loss_counts": loss_vector(analytics.get("loss_reasons")).tolist(),
+        "loss_reason_weight": loss_reason_weight,
+        "params": params,
+    }
+
+def _percentiles(values):
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    return {"mean": float(values.mean()), "p5": float(p5), "median": float(p50), "p95": float(p95)}
+
+def simulate_runs(config, runs=10000, jobs=None, seed=None):
+    """
+    Simulate `runs` runs over a process pool (jobs=1 runs inline).
+    Returns a report of win rate, elimination stage, loss reasons and the
+    distribution of final stats and gaps to ideal. Throughput is timed from
+    once the pool is up; its start-up is reported as "startup_seconds".
+    """
+    from multiprocessing import Pool
+    if runs < 1:
+        raise ValueError(f"runs must be at least 1, got {runs}")
+    jobs = jobs or os.cpu_count() or 1
+    full, rest = divmod(runs, SIM_CHUNK_RUNS)
+    sizes = [SIM_CHUNK_RUNS] * full + ([rest] if rest else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(config, n, s) for n, s in zip(sizes, seeds)]
+    jobs = min(jobs, len(tasks))   # No idle workers for small runs
+    # Workers must reference the importable module, not __main__
+    from stat_planner import simulate as worker_mod
+    startup = 0.0
+    if jobs == 1:
+        t0 = time.perf_counter()
+        parts = [worker_mod._run_chunk(t) for t in tasks]
+    else:
+        t_pool = time.perf_counter()
+        with Pool(jobs) as pool:
+            t0 = time.perf_counter()
+            startup = t0 - t_pool
+            parts = pool.map(worker_mod._run_chunk, tasks)
+    final = np.concatenate([p[0] for p in parts])
+    passed = np.concatenate([p[1] for p in parts])
+    reason = np.concatenate([p[2] for p in parts])
+    elapsed = time.perf_counter() - t0
+
+    races = config["rounds"] + 3
+    gaps = np.asarray(config["ideal"]) - final
+    eliminated = {race_stage(r, config["rounds"]): int((passed == r).sum()) for r in range(races)}
+    return {
+        "runs": runs,
+        "jobs": jobs,
+        "seconds": elapsed,
+        "startup_seconds": startup,
+        "runs_per_sec": runs / elapsed if elapsed else None,
+        "win_rate": float((passed == races).mean()),
+        "eliminated_at": eliminated,
+        "loss_reasons": {s: int((reason == i).sum()) for i, s in enumerate(STATS)},
+        "final_stats": {s: _percentiles(final[:, i]) for i, s in enumerate(STATS)},
+        "gap_to_ideal": {s: _percentiles(gaps[:, i]) for i, s in enumerate(STATS)},
+    }
+
+def print_report(report):
+    print(f"{report['runs']} runs on {report['jobs']} processes in {report['seconds']:.2f}s "
+          f"(+{report['startup_seconds']:.2f}s pool start-up) — {report['runs_per_sec']:.0f} runs/s")
+    print(f"Win rate: {report['win_rate']:.1%}")
+    print("Eliminated at: " + ", ".join(f"{k} {v}" for k, v in report["eliminated_at"].items() if v))
+    print(f"  {'Stat':10} {'final p5':>9} {'median':>8} {'p95':>8} {'gap med':>8} {'losses':>7}")
+    for s in STATS:
+        f, g = report["final_stats"][s], report["gap_to_ideal"][s]
+        print(f"  {s:10} {f['p5']:9.0f} {f['median']:8.0f} {f['p95']:8.0f} {g['median']:8.0f} "
+              f"{report['loss_reasons'][s]:7}")
+
+def main(argv=None):
+    import argparse
+    import json
+    from .profiles import get_profiles
+    parser = argparse.ArgumentParser(
+        prog="python -m stat_planner.simulate",
+        description="Estimate a trainee's win odds by simulating complete runs.")
+    parser.add_argument("profile", help="Trainee name from profiles.json")
+    parser.add_argument("--rounds", type=int, default=3, help="Preliminary rounds before the Quarter-Final")
+    parser.add_argument("--turns", type=int, default=6, help="Training turns before each race")
+    parser.add_argument("--start", type=int, nargs=len(STATS), metavar="N",
+                        help=f"Starting stats in order: {' '.join(STATS)} (default: {SIM_START_STAT} each)")
+    parser.add_argument("--runs", type=int, default=10000)
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+    profile = next((p for p in get_profiles() if p["name"] == args.profile), None)
+    if profile is None:
+        parser.error(f"No trainee named {args.profile!r}")
+    start = dict(zip(STATS, args.start)) if args.start else None
+    config = make_config(profile["ideal_stats"], args.rounds, args.turns, start, profile.get("analytics"))
+    report = simulate_runs(config, args.runs, args.jobs, args.seed)
+    print_report(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 import json
+import os
 from pathlib import Path
+from . import settings
 from .settings import BASE_PATH
 
 STATE_FILE = BASE_PATH / "run_state.json"
@@ -17,12 +19,43 @@ def save_state(state: dict):
       - turns_left (int)
       - turn (int)
       - stat_priorities (dict, optional)
+    Turns played since are appended to the journal (see journal.py) and
+    folded in by load_state().
     """
-    with open(STATE_FILE, "w") as f:
+    if settings.STORAGE_BACKEND == "sqlite":
+        from . import database
+        database.save_state(state)
+        return
+    tmp = STATE_FILE.with_name(STATE_FILE.name + ".tmp")
+    with open(tmp, "w") as f:
         json.dump(state, f, indent=2)
+    os.replace(tmp, STATE_FILE)
 
-def load_state():
+def _load_snapshot():
+    if settings.STORAGE_BACKEND == "sqlite":
+        from . import database
+        return database.load_state()
     if not STATE_FILE.exists():
         return None
     with open(STATE_FILE, "r") as f:
         return json.load(f)
+
+def load_state():
+    """The saved snapshot with the journal replayed on top, or None."""
+    from . import journal
+    return journal.replay(_load_snapshot())
+
+def has_state():
+    if settings.STORAGE_BACKEND == "sqlite":
+        from . import database
+        return database.has_state()
+    return STATE_FILE.exists()
+
+def clear_state():
+    from . import journal
+    journal.discard()
+    if settings.STORAGE_BACKEND == "sqlite":
+        from . import database
+        database.clear_state()
+        return
+    STATE_FILE.unlink(missing_ok=True)
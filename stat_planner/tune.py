@@ -0,0 +1,248 @@
+"""
+Planner weight tuning.
+
+Tries combinations of the weight settings (PRIORITY_WEIGHTS, catch-up,
+overshoot, feedback and loss-reason weights) on a trainee and ranks them by
+  - simulated win rate (simulate.py; every candidate sees the same random
+    draws, so differences come from the weights, not the dice), then
+  - agreement with recorded runs: how often the candidate would have
+    trained the stat that actually gained most on each recorded turn.
+Candidates are spread over a process pool. The best one is written to
+PLANNER_OVERRIDES_FILE, which settings.py loads on startup.
+
+    python -m stat_planner.tune "Trainee name" --search random --samples 300
+    python -m stat_planner.tune "Trainee name" --search grid --histories run_state.json stat_history.csv
+"""
+import csv
+import itertools
+import json
+import os
+import time
+from pathlib import Path
+import numpy as np
+from . import settings
+from .settings import STATS, TUNABLE_SETTINGS, TUNABLE_DEFAULTS, PLANNER_OVERRIDES_FILE, SIM_START_STAT
+from .planner import score_states, stats_vector, priority_vector, loss_vector
+from .simulate import make_config, simulate_chunk
+
+# Search space. PRIORITY_SPREAD stretches the PRIORITY_WEIGHTS written in
+# settings.py around 1.0 (0 = priorities ignored, 1 = as written) instead of
+# tuning each level. It's always applied to those defaults, never to
+# already-tuned weights, so repeated tuning runs don't compound.
+GRID = {
+    "PRIORITY_SPREAD":         [0.5, 1.0, 1.5],
+    "CATCHUP_THRESHOLD":       [0.5, 0.6, 0.7],
+    "CATCHUP_BOOST":           [1.2, 1.6, 2.0],
+    "OVERSHOOT_THRESHOLD":     [0.8, 0.85, 0.9],
+    "OVERSHOOT_PENALTY_SCALE": [1, 3, 5],
+    "FEEDBACK_WEIGHT":         [1, 2, 3],
+    "LOSS_REASON_WEIGHT":      [0.1, 0.3, 0.5],
+}
+RANGES = {
+    "PRIORITY_SPREAD":         (0.0, 2.0),
+    "CATCHUP_THRESHOLD":       (0.4, 0.8),
+    "CATCHUP_BOOST":           (1.0, 2.5),
+    "OVERSHOOT_THRESHOLD":     (0.7, 0.95),
+    "OVERSHOOT_PENALTY_SCALE": (0.0, 6.0),
+    "FEEDBACK_WEIGHT":         (0.0, 4.0),
+    "LOSS_REASON_WEIGHT":      (0.0, 1.0),
+}
+
+def current_spread():
+    """PRIORITY_SPREAD of the PRIORITY_WEIGHTS in use (1.0 without overrides)."""
+    defaults = TUNABLE_DEFAULTS["PRIORITY_WEIGHTS"]
+    # Measured on the level furthest from 1.0, where rounding matters least
+    level = max(defaults, key=lambda name: abs(defaults[name] - 1.0))
+    if defaults[level] == 1.0 or level not in settings.PRIORITY_WEIGHTS:
+        return 1.0
+    return round((settings.PRIORITY_WEIGHTS[level] - 1.0) / (defaults[level] - 1.0), 4)
+
+def current_candidate():
+    """The weights settings.py is using now, as a candidate."""
+    candidate = {name: getattr(settings, name) for name in TUNABLE_SETTINGS if name != "PRIORITY_WEIGHTS"}
+    candidate["PRIORITY_SPREAD"] = current_spread()
+    return candidate
+
+def to_settings(candidate):
+    """Candidate -> {setting name: value}, expanding PRIORITY_SPREAD into PRIORITY_WEIGHTS."""
+    values = {k: v for k, v in candidate.items() if k != "PRIORITY_SPREAD"}
+    spread = candidate.get("PRIORITY_SPREAD", 1.0)
+    values["PRIORITY_WEIGHTS"] = {name: round(1.0 + (w - 1.0) * spread, 4)
+                                  for name, w in TUNABLE_DEFAULTS["PRIORITY_WEIGHTS"].items()}
+    return values
+
+def grid_candidates():
+    names = list(GRID)
+    for combo in itertools.product(*(GRID[n] for n in names)):
+        yield dict(zip(names, combo))
+
+def random_candidates(samples, seed=None):
+    rng = np.random.default_rng(seed)
+    for _ in range(samples):
+        yield {name: round(float(rng.uniform(lo, hi)), 3) for name, (lo, hi) in RANGES.items()}
+
+# === Recorded runs ===
+
+def load_history(path):
+    """
+    Turn-by-turn stats from a saved run state (.json) or a CSV export.
+    Returns (states, ideal or None, priorities or None).
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="") as f:
+            rows = [{s: int(r[s]) for s in STATS} for r in csv.DictReader(f)]
+        return rows, None, None
+    with open(path, "r") as f:
+        data = json.load(f)
+    return data.get("history", []), data.get("ideal_stats"), data.get("stat_priorities")
+
+def replay_transitions(histories, default_ideal):
+    """
+    Every recorded turn where some stat went up, as arrays for scoring:
+    (states, ideals, priorities per row, index of the stat that gained most).
+    """
+    states, ideals, priorities, trained = [], [], [], []
+    for history, ideal, prios in histories:
+        ideal = stats_vector(ideal or default_ideal)
+        for before, after in zip(history, history[1:]):
+            gain = stats_vector(after) - stats_vector(before)
+            if gain.max() <= 0:
+                continue
+            states.append(stats_vector(before))
+            ideals.append(ideal)
+            priorities.append(prios)
+            trained.append(int(gain.argmax()))
+    return states, ideals, priorities, trained
+
+# === Evaluation (runs in the workers) ===
+
+_base = None
+
+def _init_worker(base):
+    global _base
+    _base = base
+
+def evaluate(candidate):
+    base = _base
+    candidate = dict(candidate)
+    result = {"candidate": candidate, "baseline": bool(candidate.pop("baseline", False))}
+    params = to_settings(candidate)
+
+    config = make_config(base["ideal"], base["rounds"], base["turns"], base["start"],
+                         base["analytics"], params=params)
+    final, passed, _ = simulate_chunk(config, base["runs"], base["seed"])
+    ideal = np.asarray(config["ideal"])
+    result["win_rate"] = float((passed == base["rounds"] + 3).mean())
+    result["mean_gap"] = float(np.clip((ideal - final) / ideal, 0.0, None).sum(axis=1).mean())
+
+    states, ideals, prios, trained = base["replay"]
+    if states:
+        pw = np.array([priority_vector(p, params) for p in prios])
+        losses = loss_vector(base["analytics"].get("loss_reasons"))
+        best, _, _ = score_states(np.array(states), np.array(ideals), pw, False, losses, params=params)
+        result["agreement"] = float((best == np.array(trained)).mean())
+    else:
+        result["agreement"] = None
+    return result
+
+def _rank_key(result):
+    # On a tie the current weights stay, so nothing gets rewritten for no gain
+    return (result["win_rate"], result["agreement"] or 0.0, -result["mean_gap"], result["baseline"])
+
+def tune(base, candidates, jobs=None):
+    """Evaluate every candidate (plus the current settings) and return results best first."""
+    jobs = jobs or os.cpu_count() or 1
+    baseline = dict(current_candidate(), baseline=True)
+    tasks = [baseline] + list(candidates)
+    # Workers must reference the importable module, not __main__
+    from stat_planner import tune as worker_mod
+    if jobs == 1:
+        worker_mod._init_worker(base)
+        results = [worker_mod.evaluate(c) for c in tasks]
+    else:
+        from multiprocessing import Pool
+        with Pool(jobs, initializer=worker_mod._init_worker, initargs=(base,)) as pool:
+            results = list(pool.imap_unordered(worker_mod.evaluate, tasks, chunksize=4))
+    return sorted(results, key=_rank_key, reverse=True)
+
+def write_overrides(result, path=PLANNER_OVERRIDES_FILE, **info):
+    data = {
+        "settings": to_settings(result["candidate"]),
+        "tuned": dict(info, win_rate=result["win_rate"], agreement=result["agreement"],
+                      date=time.strftime("%Y-%m-%dT%H:%M:%S")),
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def print_ranking(results, top):
+    print(f"  {'#':>3} {'win':>6} {'agree':>6} {'gap':>6}  candidate")
+    for i, r in enumerate(results[:top], 1):
+        agree = f"{r['agreement']:.1%}" if r["agreement"] is not None else "—"
+        tag = "  (current)" if r["baseline"] else ""
+        params = ", ".join(f"{k}={v}" for k, v in r["candidate"].items())
+        print(f"  {i:3} {r['win_rate']:6.1%} {agree:>6} {r['mean_gap']:6.3f}  {params}{tag}")
+
+def main(argv=None):
+    import argparse
+    from .profiles import get_profiles
+    parser = argparse.ArgumentParser(
+        prog="python -m stat_planner.tune",
+        description="Search planner weights on simulated and recorded runs and save the best.")
+    parser.add_argument("profile", help="Trainee name from profiles.json")
+    parser.add_argument("--search", choices=["grid", "random"], default="random")
+    parser.add_argument("--samples", type=int, default=200, help="Candidates for random search")
+    parser.add_argument("--histories", nargs="*", default=[],
+                        help="Saved run states (.json) or CSV exports to replay")
+    parser.add_argument("--rounds", type=int, default=3, help="Preliminary rounds before the Quarter-Final")
+    parser.add_argument("--turns", type=int, default=6, help="Training turns before each race")
+    parser.add_argument("--start", type=int, nargs=len(STATS), metavar="N",
+                        help=f"Starting stats in order: {' '.join(STATS)} (default: {SIM_START_STAT} each)")
+    parser.add_argument("--runs", type=int, default=2000, help="Simulated runs per candidate")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=10, help="Candidates to print")
+    parser.add_argument("--out", help="Write every result as JSON")
+    parser.add_argument("--overrides", default=str(PLANNER_OVERRIDES_FILE),
+                        help="Where to save the winning weights (default: %(default)s)")
+    parser.add_argument("--no-write", action="store_true", help="Only rank; don't save the winner")
+    args = parser.parse_args(argv)
+
+    profile = next((p for p in get_profiles() if p["name"] == args.profile), None)
+    if profile is None:
+        parser.error(f"No trainee named {args.profile!r}")
+    histories = [load_history(p) for p in args.histories]
+    base = {
+        "ideal": profile["ideal_stats"],
+        "analytics": profile.get("analytics", {}),
+        "rounds": args.rounds,
+        "turns": args.turns,
+        "start": dict(zip(STATS, args.start)) if args.start else None,
+        "runs": args.runs,
+        "seed": args.seed,
+        "replay": replay_transitions(histories, profile["ideal_stats"]),
+    }
+    candidates = grid_candidates() if args.search == "grid" else random_candidates(args.samples, args.seed)
+
+    t0 = time.perf_counter()
+    results = tune(base, candidates, args.jobs)
+    elapsed = time.perf_counter() - t0
+    print(f"{len(results)} candidates x {args.runs} runs, {len(base['replay'][0])} recorded turns "
+          f"in {elapsed:.1f}s — {len(results) * args.runs / elapsed:.0f} runs/s")
+    print_ranking(results, args.top)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    best = results[0]
+    if best["baseline"]:
+        print("[INFO] The current weights ranked first; nothing written.")
+    elif not args.no_write:
+        baseline = next(r for r in results if r["baseline"])
+        write_overrides(best, Path(args.overrides), trainee=args.profile, search=args.search,
+                        runs=args.runs, baseline_win_rate=baseline["win_rate"])
+        print(f"[INFO] Best weights written to {args.overrides} "
+              f"(win rate {baseline['win_rate']:.1%} -> {best['win_rate']:.1%}); restart the app to use them.")
+
+if __name__ == "__main__":
+    main()
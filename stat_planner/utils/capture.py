@@ -0,0 +1,104 @@
+import cv2
+import numpy as np
+from pathlib import Path
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".bmp"}
+
+def to_gray(frame):
+    """Grayscale view of `frame`; 2D uint8 arrays are returned as-is (no copy)."""
+    frame = np.asarray(frame)
+    if frame.ndim == 2:
+        return frame
+    if frame.shape[2] == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+class CaptureBackend:
+    """
+    Source of grayscale frames for the OCR.
+
+    window_box() returns the capture area as (left, top, right, bottom), or
+    None when it can't be known before grabbing. grab(bbox) returns a 2D
+    uint8 array of that area, or of the whole capture when bbox is None.
+    """
+    def window_box(self):
+        return None
+
+    def grab(self, bbox=None):
+        raise NotImplementedError
+
+class LiveCapture(CaptureBackend):
+    """The game window (or primary monitor) via PIL ImageGrab."""
+    def window_box(self):
+        from .screenshot import game_window_box
+        return game_window_box()
+
+    def grab(self, bbox=None):
+        from .screenshot import grab_game_screen
+        # Let PIL do RGB -> L in one pass instead of RGB -> BGR -> GRAY in cv2
+        return np.asarray(grab_game_screen(bbox=bbox).convert("L"))
+
+class ArrayCapture(CaptureBackend):
+    """
+    An in-memory frame. Crops are returned as views into the buffer, so
+    feeding frames from tests or benchmarks costs no copies.
+    """
+    def __init__(self, frame=None):
+        self.frame = None if frame is None else to_gray(frame)
+
+    def set_frame(self, frame):
+        self.frame = to_gray(frame)
+
+    def window_box(self):
+        if self.frame is None:
+            return None
+        h, w = self.frame.shape
+        return (0, 0, w, h)
+
+    def grab(self, bbox=None):
+        if self.frame is None:
+            raise RuntimeError("No frame loaded")
+        if bbox is None:
+            return self.frame
+        left, top, right, bottom = bbox
+        return self.frame[top:bottom, left:right]
+
+class DirectoryCapture(ArrayCapture):
+    """
+    Streams the screenshots in a directory, one per advance(). Only the
+    current frame is held in memory.
+    """
+    def __init__(self, directory, loop=False):
+        super().__init__()
+        self.paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in IMAGE_EXTS)
+        self.loop = loop
+        self.index = -1
+
+    @property
+    def path(self):
+        return self.paths[self.index] if 0 <= self.index < len(self.paths) else None
+
+    def advance(self):
+        """
+        Load the next frame. Returns False once the directory is exhausted, or
+        when looping and a full pass found no readable image.
+        """
+        for _ in range(max(1, len(self.paths))):   # at most one full pass
+            self.index += 1
+            if self.index >= len(self.paths):
+                if not self.loop or not self.paths:
+                    self.frame = None
+                    return False
+                self.index = 0
+            frame = cv2.imread(str(self.paths[self.index]), cv2.IMREAD_GRAYSCALE)
+            if frame is not None:
+                self.frame = frame
+                return True
+            print(f"[WARN] Skipping unreadable image: {self.paths[self.index]}")
+        print("[WARN] No readable images left to replay.")
+        self.frame = None
+        return False
+
+    def __iter__(self):
+        while self.advance():
+            yield self.frame
@@ -1,15 +1,30 @@
+import time
 import psutil
 import pygetwindow as gw
 from PIL import ImageGrab
-from ..settings import GAME_EXE
+from ..settings import GAME_EXE, WINDOW_MISS_RETRY_S
 
-def find_game_window(process_name):
-    """
-    Attempt to find the game window by matching process name or window title.
-    """
+# Last lookup result, re-validated cheaply instead of rescanning every call
+_window_cache = {"name": None, "window": None, "miss": None, "miss_until": 0.0}
+_lookup_stats = {
+    "full_scans": 0, "full_scan_ms": 0.0,
+    "cache_hits": 0, "cache_hit_ms": 0.0,
+    "last_ms": 0.0,
+}
+
+def _title_key(process_name):
+    return process_name.lower().replace('.exe', '')
+
+def _window_still_valid(window, process_name):
+    try:
+        return window.isVisible and _title_key(process_name) in window.title.lower()
+    except gw.PyGetWindowException:
+        return False
+
+def _scan_for_game_window(process_name):
     # Try to match window title
     for window in gw.getAllTitles():
-        if process_name.lower().replace('.exe', '') in window.lower():
+        if _title_key(process_name) in window.lower():
             try:
                 w = gw.getWindowsWithTitle(window)[0]
                 if w.isVisible:
@@ -29,14 +44,70 @@ def find_game_window(process_name):
 
     return None  # Nothing found
 
-def grab_game_screen():
+def _record(kind, t0):
+    ms = (time.perf_counter() - t0) * 1000
+    _lookup_stats[kind + "s"] += 1
+    _lookup_stats[kind + "_ms"] += ms
+    _lookup_stats["last_ms"] = ms
+
+def find_game_window(process_name):
+    """
+    Attempt to find the game window by matching process name or window title.
+    A found window is cached and only re-validated on later calls; a miss is
+    remembered for WINDOW_MISS_RETRY_S before enumerating everything again.
+    """
+    t0 = time.perf_counter()
+    cache = _window_cache
+    if cache["name"] == process_name:
+        window = cache["window"]
+        if window is not None:
+            if _window_still_valid(window, process_name):
+                _record("cache_hit", t0)
+                return window
+            print("[INFO] Cached game window went stale; rescanning.")
+            cache["window"] = None
+        elif time.monotonic() < cache["miss_until"]:
+            _record("cache_hit", t0)
+            return cache["miss"]
+
+    result = _scan_for_game_window(process_name)
+    cache["name"] = process_name
+    if hasattr(result, 'box'):
+        cache["window"] = result
+    else:
+        cache["window"] = None
+        cache["miss"] = result
+        cache["miss_until"] = time.monotonic() + WINDOW_MISS_RETRY_S
+    _record("full_scan", t0)
+    return result
+
+def reset_window_cache():
+    _window_cache.update(name=None, window=None, miss=None, miss_until=0.0)
+
+def window_lookup_stats():
+    """Counts and total/last timings (ms) of full scans vs. cached lookups."""
+    return dict(_lookup_stats)
+
+def game_window_box():
+    """
+    Screen bbox (left, top, right, bottom) of the visible game window, or None.
+    """
+    window = find_game_window(GAME_EXE)
+    if hasattr(window, 'box'):
+        return (window.left, window.top, window.right, window.bottom)
+    return None
+
+def grab_game_screen(bbox=None):
     """
     Capture a screenshot of the game window if possible, fallback to primary monitor.
+    Pass `bbox` (screen coords) to capture just that rectangle.
     """
+    if bbox is not None:
+        return ImageGrab.grab(bbox)
     window = find_game_window(GAME_EXE)
     if hasattr(window, 'box'):
         print(f"[INFO] Capturing game window: {window.title}")
-        bbox = window.box  # (left, top, right, bottom)
+        bbox = (window.left, window.top, window.right, window.bottom)
         return ImageGrab.grab(bbox)
     elif window is True:
         print("[WARN] Process found but no visible window. Trying full display fallback.")
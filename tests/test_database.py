@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+from stat_planner import database, profiles, settings, state
+from stat_planner.settings import STATS
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Both backends pointed at tmp_path, starting empty."""
+    database.close()
+    monkeypatch.setattr(database, "DATABASE_FILE", tmp_path / "stat_planner.db")
+    monkeypatch.setattr(profiles, "PROFILES_FILE", tmp_path / "profiles.json")
+    monkeypatch.setattr(state, "STATE_FILE", tmp_path / "run_state.json")
+    monkeypatch.setattr(profiles, "_profiles", None)
+    monkeypatch.setattr(profiles, "_dirty", set())
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "json")
+    yield tmp_path
+    database.close()
+
+
+def make_profiles(n=3):
+    """Profiles with every kind of analytics, recorded through profiles.py."""
+    profiles._profiles = [
+        {"name": f"Trainee {i}", "ideal_stats": {s: 600 + 10 * i for s in STATS}, "photo": None}
+        for i in range(n)
+    ]
+    prev = {s: 100 for s in STATS}
+    for i in range(n):
+        for turn in range(1, 8):
+            new = {s: v + turn * (i + 1) for s, v in prev.items()}
+            profiles.record_action_gain(i, STATS[turn % len(STATS)], prev, new, turn)
+        profiles.record_feedback(i, "power", loss=True)
+        profiles.record_feedback(i, "wit")
+        profiles.record_loss_reason(i, "speed")
+    return json.loads(json.dumps(profiles._profiles))
+
+
+def make_history(turns):
+    return [{s: 100 + t * (j + 1) for j, s in enumerate(STATS)} for t in range(turns)]
+
+
+def make_state(history):
+    return {
+        "profile_index": 1,
+        "ideal_stats": {s: 700 for s in STATS},
+        "current_stats": history[-1],
+        "history": history,
+        "feedback_stat": None,
+        "total_rounds": 3,
+        "rounds_done": 1,
+        "turns_left": 4,
+        "turn": len(history),
+        "stat_priorities": {s: "Normal" for s in STATS},
+        "last_action": "speed",
+    }
+
+
+def test_profiles_round_trip(store):
+    expected = make_profiles()
+    database.save_profiles(expected)
+    assert database.load_profiles() == expected
+
+
+def test_import_json_round_trip(store):
+    expected = make_profiles()   # written to profiles.json by the flushes
+    run = make_state(make_history(12))
+    state.save_state(run)
+    imported = database.import_json()
+    assert imported == {"profiles": len(expected), "history": 12}
+    assert database.load_profiles() == expected
+    assert database.load_state() == run
+
+    # And back: the sqlite backend serves the same data through profiles.py / state.py
+    settings.STORAGE_BACKEND = "sqlite"
+    profiles._profiles = None
+    assert profiles.get_profiles() == expected
+    assert state._load_snapshot() == run
+
+
+def test_partial_flush_writes_only_dirty_profiles(store):
+    saved = make_profiles()
+    database.save_profiles(saved)
+    saved[1]["ideal_stats"]["speed"] = 999
+    saved[2]["ideal_stats"]["speed"] = 999   # not passed in indices, so not written
+    database.save_profiles(saved, {1})
+    loaded = database.load_profiles()
+    assert loaded[1]["ideal_stats"]["speed"] == 999
+    assert loaded[2]["ideal_stats"]["speed"] != 999
+
+
+def test_removed_profile_leaves_no_rows(store):
+    saved = make_profiles(4)
+    database.save_profiles(saved)
+    del saved[1]
+    database.save_profiles(saved, {0})   # list shape changed: rewritten in full
+    assert database.load_profiles() == saved
+    conn = database.connect()
+    for table in database._PROFILE_TABLES:
+        assert conn.execute(f"SELECT MAX(profile) FROM {table}").fetchone()[0] == len(saved) - 1
+
+
+def test_state_appends_history_and_rewrites_changed_prefix(store):
+    history = make_history(10)
+    database.save_state(make_state(history))
+    history.append(make_history(11)[-1])
+    database.save_state(make_state(history))
+    assert database.load_state()["history"] == history
+
+    # An earlier turn edited: the stored rows are no longer a prefix
+    history[3] = dict(history[3], speed=1)
+    database.save_state(make_state(history))
+    assert database.load_state()["history"] == history
+
+    # Shorter history (e.g. a new run) replaces the old one
+    database.save_state(make_state(history[:2]))
+    assert database.load_state()["history"] == history[:2]
+
+
+def test_schema_version(store):
+    conn = database.connect()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION
+    # A database from before versioning is migrated on connect
+    conn.execute("PRAGMA user_version = 0")
+    database.close()
+    conn = database.connect()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION
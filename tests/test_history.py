@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from stat_planner.history import RunHistory, StatVector, as_history
+from stat_planner.settings import STATS
+
+
+def turns(n):
+    return [{s: 100 + t * (j + 1) for j, s in enumerate(STATS)} for t in range(n)]
+
+
+def test_grows_past_capacity_and_keeps_rows():
+    rows = turns(20)
+    history = RunHistory(capacity=4)
+    handed_out = []
+    for stats in rows:
+        history.append(stats)
+        handed_out.append(history[-1])
+    assert len(history) == 20
+    assert history.to_list() == rows
+    # Rows read before the buffer grew still hold their values
+    assert [v.to_dict() for v in handed_out] == rows
+
+
+def test_append_accepts_arrays_in_stats_order():
+    history = RunHistory()
+    history.append(np.arange(len(STATS)))
+    assert history[0] == dict(zip(STATS, range(len(STATS))))
+
+
+def test_indexing():
+    rows = turns(5)
+    history = RunHistory(rows)
+    assert history[0] == rows[0]
+    assert history[-1] == rows[-1]
+    assert history[-5] == rows[0]
+    assert isinstance(history[2], StatVector)
+    assert history[2]["power"] == rows[2]["power"]
+    assert list(history[2]) == STATS
+    assert [row.to_dict() for row in history] == rows
+    for i in (5, -6):
+        with pytest.raises(IndexError):
+            history[i]
+
+
+def test_slicing_returns_an_independent_history():
+    rows = turns(6)
+    history = RunHistory(rows)
+    tail = history[2:]
+    assert isinstance(tail, RunHistory)
+    assert tail.to_list() == rows[2:]
+    assert history[::2].to_list() == rows[::2]
+    assert history[10:].to_list() == []
+    tail.append(rows[0])
+    assert len(history) == 6
+
+
+def test_columns_and_array_are_read_only_views():
+    rows = turns(4)
+    history = RunHistory(rows)
+    assert history.column("wit").tolist() == [r["wit"] for r in rows]
+    assert history.array.shape == (4, len(STATS))
+    with pytest.raises(ValueError):
+        history.array[0, 0] = 1
+    with pytest.raises(TypeError):
+        history[0]["speed"] = 1
+
+
+def test_clear_leaves_old_rows_intact():
+    rows = turns(3)
+    history = RunHistory(rows)
+    first = history[0]
+    history.clear()
+    assert len(history) == 0
+    assert first == rows[0]
+    history.append(rows[2])
+    assert history.to_list() == [rows[2]]
+
+
+def test_as_history():
+    history = RunHistory(turns(2))
+    assert as_history(history) is history
+    assert as_history(turns(2)).to_list() == turns(2)
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from stat_planner import journal, settings, state
+from stat_planner.settings import STATS
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    """Snapshot and journal in tmp_path, with no journal open or replayed yet."""
+    journal.close()
+    monkeypatch.setattr(journal, "JOURNAL_FILE", tmp_path / "run_journal.jsonl")
+    monkeypatch.setattr(state, "STATE_FILE", tmp_path / "run_state.json")
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "json")
+    for name, value in [("_seq", None), ("_snapshot_seq", 0), ("_unsynced", 0), ("_good_size", None)]:
+        monkeypatch.setattr(journal, name, value)
+    journal.start({"profile_index": 0, "history": [], "current_stats": None, "last_action": None,
+                   "turn": 0, "turns_left": 12})
+    yield tmp_path
+    journal.close()
+
+
+def restart():
+    """Forget everything in memory, as after the app (or a crash) ends."""
+    journal.close()
+    journal._seq, journal._snapshot_seq, journal._good_size = None, 0, None
+
+
+def stats(turn):
+    return {s: 100 + turn * (j + 1) for j, s in enumerate(STATS)}
+
+
+def play_turn(turn, action="speed", snapshot=None):
+    """One turn as the GUI journals it: stats confirmed, action chosen, turn finished."""
+    counters = {"turn": turn, "turns_left": 12 - turn}
+    journal.append("turn", counters, snapshot, stats=stats(turn))
+    journal.append("action", counters, snapshot, action=action)
+    journal.append("ready", counters, snapshot)
+
+
+def test_replay_restores_turns_on_top_of_the_snapshot(run):
+    play_turn(1)
+    play_turn(2, action="power")
+    journal.append("turn", {"turn": 3, "turns_left": 9}, stats=stats(3))
+    restart()
+
+    restored = state.load_state()
+    assert restored["history"] == [stats(1), stats(2), stats(3)]
+    assert restored["current_stats"] == stats(3)
+    assert restored["turn"] == 3 and restored["turns_left"] == 9
+    # The action before turn 3 was consumed by its gains
+    assert restored["last_action"] is None
+    assert restored["journal_seq"] == journal._seq == 7
+    assert restored["profile_index"] == 0
+
+
+def test_pending_action_survives(run):
+    play_turn(1, action="guts")
+    restart()
+    assert state.load_state()["last_action"] == "guts"
+
+
+def test_torn_last_line_is_dropped_and_overwritten(run):
+    play_turn(1)
+    restart()
+    with open(journal.JOURNAL_FILE, "a") as f:
+        f.write('{"seq":4,"op":"turn","run":{"turn":2')   # crash mid-write
+
+    restored = state.load_state()
+    assert restored["history"] == [stats(1)]
+    assert journal._seq == 3
+
+    # The next record replaces the torn tail instead of following it
+    journal.append("turn", {"turn": 2, "turns_left": 10}, stats=stats(2))
+    restart()
+    lines = journal.JOURNAL_FILE.read_text().splitlines()
+    assert [json.loads(line)["seq"] for line in lines] == [1, 2, 3, 4]
+    assert state.load_state()["history"] == [stats(1), stats(2)]
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(run, monkeypatch):
+    monkeypatch.setattr(journal, "JOURNAL_COMPACT_EVERY", 6)
+    live = {"ideal_stats": {s: 700 for s in STATS}}
+    play_turn(1, snapshot=lambda: dict(state.load_state(), **live))
+    play_turn(2, snapshot=lambda: dict(state.load_state(), **live))
+    assert not journal.JOURNAL_FILE.exists()
+    with open(state.STATE_FILE) as f:
+        snapshot = json.load(f)
+    assert snapshot["journal_seq"] == 6
+    assert snapshot["history"] == [stats(1), stats(2)]
+    assert snapshot["ideal_stats"] == live["ideal_stats"]
+
+    play_turn(3)
+    restart()
+    restored = state.load_state()
+    assert restored["history"] == [stats(1), stats(2), stats(3)]
+    assert restored["journal_seq"] == 9
+
+
+def test_records_already_in_the_snapshot_are_not_replayed_twice(run):
+    play_turn(1)
+    journal.close()
+    leftover = journal.JOURNAL_FILE.read_bytes()
+    journal.compact()
+    # Crash after the snapshot was written but before the journal was removed
+    journal.JOURNAL_FILE.write_bytes(leftover)
+    restart()
+    assert state.load_state()["history"] == [stats(1)]
+
+
+def test_discard_ends_the_run(run):
+    play_turn(1)
+    journal.discard()
+    assert not journal.JOURNAL_FILE.exists()
+    assert journal._seq is None
+    # The snapshot alone is left: the run as it started
+    assert state.load_state()["history"] == []
+
+    state.clear_state()
+    assert state.load_state() is None
+    assert not state.has_state()
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from stat_planner.lookahead import lookahead
+from stat_planner.planner import suggest_training, stats_vector, priority_vector, feedback_vector
+from stat_planner.settings import STATS
+
+IDEAL = dict(zip(STATS, [900, 600, 700, 400, 500]))
+
+
+def search(current, depth, priorities=None, feedback=None):
+    # No action_stats: every stat gains the same default amount
+    return lookahead(stats_vector(current), stats_vector(IDEAL), 10, depth=depth,
+                     priority_weights=priority_vector(priorities), feedback=feedback_vector(feedback))
+
+
+def random_states(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{s: int(rng.integers(50, 1000)) for s in STATS} for _ in range(n)]
+
+
+@pytest.mark.parametrize("current", [{s: 200 for s in STATS}] + random_states(20))
+def test_depth_one_matches_greedy(current):
+    greedy = suggest_training(current, IDEAL, 10)[0]
+    assert search(current, depth=1)["action"] == greedy
+
+
+def test_depth_one_matches_greedy_with_priorities_and_feedback():
+    priorities = {"power": "High", "wit": "Low"}
+    for current in random_states(20, seed=1):
+        greedy = suggest_training(current, IDEAL, 10, feedback="guts", priorities=priorities)[0]
+        assert search(current, 1, priorities, "guts")["action"] == greedy
+
+
+def test_deeper_search_keeps_the_greedy_pick_when_everything_is_far_behind():
+    current = {s: 200 for s in STATS}
+    for depth in (2, 4):
+        assert search(current, depth)["action"] == "speed"
@@ -0,0 +1,43 @@
+import pytest
+
+from benchmarks.synth_corpus import make_frame
+from stat_planner import ocr
+from stat_planner.assets import load_templates, load_digit_templates
+from stat_planner.settings import STATS, DIGIT_CACHE_SIZE
+from stat_planner.utils.capture import ArrayCapture
+
+VALUES = {"speed": 412, "stamina": 305, "power": 528, "guts": 233, "wit": 371}
+
+
+@pytest.fixture
+def capture():
+    """An in-memory capture with fresh layout and digit caches."""
+    previous = ocr.get_capture_backend()
+    backend = ArrayCapture()
+    ocr.set_capture_backend(backend)
+    ocr.set_digit_cache_size(DIGIT_CACHE_SIZE)
+    ocr.clear_digit_cache()
+    yield backend
+    ocr.set_capture_backend(previous)
+    ocr.clear_digit_cache()
+
+
+def frame(values):
+    return make_frame(values, load_templates(), load_digit_templates())
+
+
+@pytest.mark.parametrize("anchored", [False, True])
+def test_unchanged_numbers_hit_digit_cache(capture, anchored):
+    capture.set_frame(frame(VALUES))
+    assert ocr.read_stats()["values"] == VALUES
+    assert ocr.digit_cache_stats()["misses"] == len(STATS)
+
+    # One number changes; the frame's histogram (and equalization) with it
+    changed = dict(VALUES, speed=498)
+    capture.set_frame(frame(changed))
+    if not anchored:
+        ocr.clear_layout_cache()
+    assert ocr.read_stats()["values"] == changed
+    stats = ocr.digit_cache_stats()
+    assert stats["hits"] == len(STATS) - 1
+    assert stats["misses"] == len(STATS) + 1
@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+import pytest
+
+from stat_planner import profiles, settings
+from stat_planner.settings import STATS, GAIN_BUCKET_TURNS
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """profiles.json in tmp_path, starting empty."""
+    monkeypatch.setattr(profiles, "PROFILES_FILE", tmp_path / "profiles.json")
+    monkeypatch.setattr(profiles, "PHOTOS_DIR", tmp_path / "photos")
+    monkeypatch.setattr(profiles, "_profiles", None)
+    monkeypatch.setattr(profiles, "_dirty", set())
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "json")
+    return tmp_path
+
+
+def trainee(analytics=None):
+    profile = {"name": "Trainee", "ideal_stats": {s: 600 for s in STATS}, "photo": None}
+    if analytics is not None:
+        profile["analytics"] = analytics
+    return profile
+
+
+def record_gains(gains, action="speed", start_turn=0):
+    """Record one turn per row of `gains` (turns x STATS) for `action`."""
+    prev = {s: 100 for s in STATS}
+    for turn, row in enumerate(gains, start_turn):
+        new = {s: prev[s] + int(g) for s, g in zip(STATS, row)}
+        profiles.record_action_gain(0, action, prev, new, turn)
+
+
+def test_summary_matches_numpy(store):
+    profiles._profiles = [trainee()]
+    gains = np.random.default_rng(0).integers(0, 40, size=(50, len(STATS)))
+    record_gains(gains)
+    record = profiles.get_profile(0)["analytics"]["action_stats"]["speed"]
+    for j, s in enumerate(STATS):
+        g = profiles.gain_stats(record, s)
+        assert g["count"] == g["n"] == 50
+        assert g["mean"] == pytest.approx(gains[:, j].mean())
+        assert g["std"] ** 2 == pytest.approx(np.var(gains[:, j], ddof=1))
+        assert (g["min"], g["max"]) == (gains[:, j].min(), gains[:, j].max())
+
+
+def test_buckets_summarize_their_own_turns(store):
+    profiles._profiles = [trainee()]
+    gains = np.random.default_rng(1).integers(0, 40, size=(2 * GAIN_BUCKET_TURNS, len(STATS)))
+    record_gains(gains)
+    record = profiles.get_profile(0)["analytics"]["action_stats"]["speed"]
+    second = profiles.bucket_record(record, GAIN_BUCKET_TURNS)
+    g = profiles.gain_stats(second, "power")
+    column = gains[GAIN_BUCKET_TURNS:, STATS.index("power")]
+    assert g["count"] == GAIN_BUCKET_TURNS
+    assert g["mean"] == pytest.approx(column.mean())
+    assert g["std"] ** 2 == pytest.approx(np.var(column, ddof=1))
+
+
+def test_drops_count_as_zero_gain(store):
+    profiles._profiles = [trainee()]
+    prev = {s: 100 for s in STATS}
+    profiles.record_action_gain(0, "recover", prev, dict(prev, guts=90))
+    g = profiles.gain_stats(profiles.get_profile(0)["analytics"]["action_stats"]["recover"], "guts")
+    assert (g["mean"], g["min"], g["max"]) == (0.0, 0, 0)
+    assert g["std"] is None
+
+
+def test_old_records_are_migrated_and_merged(store):
+    # Saved before the streaming summaries: totals only
+    old = {"speed": {"count": 5, "gains": {s: 50 for s in STATS}}}
+    with open(profiles.PROFILES_FILE, "w") as f:
+        json.dump([trainee({"action_stats": old})], f)
+
+    record = profiles.get_profiles()[0]["analytics"]["action_stats"]["speed"]
+    assert profiles._dirty == {0}
+    assert profiles.migrate_action_stats(profiles.get_profile(0)) is False
+    g = profiles.gain_stats(record, "wit")
+    assert (g["count"], g["mean"], g["n"], g["std"]) == (5, 10.0, 0, None)
+
+    # New turns extend the totals; the spread comes from the new turns only
+    gains = np.random.default_rng(2).integers(0, 40, size=(4, len(STATS)))
+    record_gains(gains)
+    wit = gains[:, STATS.index("wit")]
+    g = profiles.gain_stats(record, "wit")
+    assert g["count"] == 9 and g["n"] == 4
+    assert g["mean"] == pytest.approx((50 + wit.sum()) / 9)
+    assert g["std"] ** 2 == pytest.approx(np.var(wit, ddof=1))
+
+    profiles.flush_profiles()
+    with open(profiles.PROFILES_FILE) as f:
+        saved = json.load(f)[0]["analytics"]["action_stats"]["speed"]
+    assert saved["summary"]["wit"]["n"] == 4